@@ -1,31 +1,422 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Request, Response, request, jsonify, g, has_request_context, stream_with_context
 from flask_cors import CORS
+import atexit
+import contextvars
+import hmac
+import json
 import logging
-import requests
-from src.password_analyzer import PasswordAnalyzer
-import src.breach_checker as breach_checker
-
-# Configure logging for production
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("app.log")  # Log to file for production
-    ]
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from src.password_analyzer import PasswordAnalyzer, generate_feedback, stage_timeout_result
+from src.breach_checker import BreachApiProbe, BreachChecker
+from src.circuit_breaker import CircuitBreaker
+from src.worker_pool import AnalysisPool, PoolBusyError
+from src.metrics import METRICS, record_timings, stop_recording
+from src import profiler
+from src.incremental import SessionStore
+from src.log_config import configure_logging, parse_sample_rates
+from src.json_provider import FastJSONProvider
+from src.admission import AdmissionController, AdmissionRejected, password_cost
+from src.capture import TrafficCapture
+
+def current_endpoint():
+    """Path of the request being handled, for per-endpoint log sampling."""
+    return request.path if has_request_context() else None
+
+# Configure logging for production; LOG_MODE=async moves disk writes off the request threads
+log_listener = configure_logging(
+    mode=os.environ.get("LOG_MODE", "sync"),
+    fmt=os.environ.get("LOG_FORMAT", "text"),
+    log_file=os.environ.get("LOG_FILE", "app.log") or None,
+    level=getattr(logging, os.environ.get("LOG_LEVEL", "INFO").upper()),
+    queue_size=int(os.environ.get("LOG_QUEUE_SIZE", "10000")),
+    sample_rates=parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES", "")),
+    endpoint_getter=current_endpoint
 )
+if log_listener:
+    atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # orjson when installed
 
 # Enable CORS for React frontend
 CORS(app, resources={r"/api/*": {"origins": " http://localhost:8080/"}})  # Restrict to your frontend URL in production
 
 # Initialize analyzers
-password_analyzer = PasswordAnalyzer()
+# ANALYSIS_MODE=process moves zxcvbn and feature extraction into a pool of warm worker processes
+ANALYSIS_MODE = os.environ.get("ANALYSIS_MODE", "thread")
+analysis_pool = None
+if ANALYSIS_MODE == "process":
+    analysis_pool = AnalysisPool(
+        workers=int(os.environ.get("ANALYSIS_WORKERS", "0")) or None,
+        max_pending=int(os.environ.get("ANALYSIS_MAX_PENDING", "0")) or None,
+        queue_timeout=float(os.environ.get("ANALYSIS_QUEUE_TIMEOUT", "1"))
+    )
+# ML_MODE=student serves the distilled model from train_models.py instead of the ensemble
+password_analyzer = PasswordAnalyzer(pool=analysis_pool, config={"ml_mode": os.environ.get("ML_MODE", "ensemble")})
+breach_checker = BreachChecker(
+    api_url=os.environ.get("HIBP_API_URL", "https://api.pwnedpasswords.com/range/"),
+    request_delay=float(os.environ.get("HIBP_REQUEST_DELAY", "1.5")),
+    batch_delay=float(os.environ.get("HIBP_BATCH_DELAY", "0.5")),
+    timeout=float(os.environ.get("HIBP_TIMEOUT", "10")),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.environ.get("BREAKER_FAILURE_THRESHOLD", "5")),
+        base_backoff=float(os.environ.get("BREAKER_BACKOFF", "5")),
+        max_backoff=float(os.environ.get("BREAKER_MAX_BACKOFF", "300"))
+    )
+)
+
+# /health reports the probe's cached result rather than calling the breach API itself
+breach_probe = BreachApiProbe(
+    breach_checker.api_url,
+    interval=float(os.environ.get("HEALTH_PROBE_INTERVAL", "30"))
+)
+if breach_probe.interval > 0:
+    breach_probe.start()
+
+# Shared executor for fanning out the independent analysis stages of a request
+STAGE_WORKERS = int(os.environ.get("STAGE_WORKERS", "16"))
+BREACH_STAGE_TIMEOUT = float(os.environ.get("BREACH_STAGE_TIMEOUT", "5"))
+stage_executor = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix="stage")
+
+# Largest number of passwords one /api/generate-passwords request may ask for, and the smaller
+# limit with exclude_breached, where every accepted password costs a rate-limited HIBP lookup
+GENERATE_MAX_COUNT = int(os.environ.get("GENERATE_MAX_COUNT", "1000"))
+GENERATE_MAX_BREACH_CHECKED = int(os.environ.get("GENERATE_MAX_BREACH_CHECKED", "10"))
+
+# Keystroke sessions: full analysis only runs once typing has been idle for SESSION_DEBOUNCE_MS
+SESSION_DEBOUNCE = float(os.environ.get("SESSION_DEBOUNCE_MS", "300")) / 1000
+session_store = SessionStore(
+    ttl=float(os.environ.get("SESSION_TTL", "300")),
+    max_sessions=int(os.environ.get("SESSION_MAX", "10000"))
+)
+
+# Streaming bulk analysis: items processed concurrently per connection, and the longest accepted input line.
+# Streams get their own executor so a long upload can't occupy the stage threads other requests fan out to.
+STREAM_WINDOW = int(os.environ.get("STREAM_WINDOW", "8"))
+STREAM_MAX_LINE = int(os.environ.get("STREAM_MAX_LINE", "4096"))
+STREAM_WORKERS = int(os.environ.get("STREAM_WORKERS", "8"))
+stream_executor = ThreadPoolExecutor(max_workers=STREAM_WORKERS, thread_name_prefix="stream")
+
+def json_response(payload, status=200):
+    """Serialize a successful response body, timing the JSON encoding."""
+    with METRICS.time("json_serialization"):
+        response = jsonify(payload)
+    return response, status
+
+# Request-side names of the methods a caller may select, mapped to result keys
+REQUEST_METHODS = {"zxcvbn": "zxcvbn", "ml": "ml_models", "breach": "breach_check"}
+COMPACT_BREACH_FIELDS = ("is_breached", "breach_count", "stale", "timed_out", "error")
+
+def parse_analysis_options(data, default_methods):
+    """
+    Read the optional `methods`, `models` and `view` fields of an analysis request
+
+    Returns:
+        tuple: (set of selected method names, model names or None, compact flag)
+
+    Raises:
+        ValueError: On an unknown method, model or view
+    """
+    methods = data.get("methods", default_methods)
+    if not isinstance(methods, list) or not methods or any(m not in REQUEST_METHODS for m in methods):
+        raise ValueError(f"methods must be a non-empty list drawn from: {', '.join(REQUEST_METHODS)}")
+    models = data.get("models")
+    if models is not None:
+        if not isinstance(models, list) or not models or any(m not in password_analyzer.models for m in models):
+            raise ValueError(f"models must be a non-empty list drawn from: {', '.join(password_analyzer.models)}")
+    view = data.get("view", "full")
+    if view not in ("full", "compact"):
+        raise ValueError("view must be 'full' or 'compact'")
+    return set(methods), models, view == "compact"
+
+def run_selected_analysis(password, methods, models):
+    """
+    Run only the selected methods; returns (analysis result, breach result or None)
+
+    The breach check, when selected, starts first so it overlaps the local stages.
+    """
+    g.selected_analysis = (sorted(methods), models)  # Recorded by traffic capture for replay
+    breach_future = None
+    if "breach" in methods:
+        breach_future = stage_executor.submit(
+            contextvars.copy_context().run, profiler.follow(breach_checker.check_password_breach), password)
+    analysis_result = password_analyzer.analyze_password(
+        password,
+        # Local stages fan out alongside the breach check, and run inline without it
+        executor=stage_executor if breach_future else None,
+        methods=[REQUEST_METHODS[m] for m in methods if m != "breach"],
+        models=models
+    )
+    if breach_future is None:
+        return analysis_result, None
+    try:
+        breach_result = breach_future.result(timeout=BREACH_STAGE_TIMEOUT)
+    except FutureTimeoutError:
+        breach_future.cancel()
+        breach_result = stage_timeout_result("breach_check", BREACH_STAGE_TIMEOUT)
+        logger.warning("Breach check timed out")
+    return analysis_result, breach_result
+
+def compact_view(analysis_result, breach_result=None):
+    """Project a result down to the overall rating, feedback and breach verdict."""
+    compact = {key: analysis_result[key] for key in ("overall", "feedback", "partial", "error") if key in analysis_result}
+    if breach_result is not None:
+        compact["breach_check"] = {key: breach_result[key] for key in COMPACT_BREACH_FIELDS if key in breach_result}
+        if breach_result.get("timed_out"):
+            compact["partial"] = True
+    return compact
+
+def pool_busy_response(error):
+    """503 response telling the client to back off while the analysis pool is saturated."""
+    logger.warning("Rejected request: %s", error)
+    response = jsonify({"error": "Server busy, please retry shortly"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+# Profiling: PROFILE_SIGNAL (e.g. SIGRTMIN) samples the worker when set; the admin
+# endpoint and the per-request X-Profile header are only wired up when ADMIN_TOKEN is set.
+# SIGUSR1/SIGUSR2 are not usable here: gunicorn workers use them to reopen logs and exit.
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_SIGNAL = os.environ.get("PROFILE_SIGNAL")
+PROFILE_UNSUPPORTED_ENDPOINTS = {"stream_analyze"}  # The body is produced after the response returns
+if PROFILE_SIGNAL:
+    profile_signal = getattr(signal, PROFILE_SIGNAL.upper(), None)
+    if profile_signal is None or profile_signal in (getattr(signal, "SIGUSR1", None), getattr(signal, "SIGUSR2", None)):
+        logger.warning("Ignoring PROFILE_SIGNAL=%s: unknown signal or one gunicorn workers use", PROFILE_SIGNAL)
+    else:
+        profiler.install_signal_handler(
+            profile_signal, float(os.environ.get("PROFILE_SIGNAL_SECONDS", "10")), PROFILE_DIR, PROFILE_INTERVAL
+        )
+
+def is_admin():
+    """Check the X-Admin-Token header against ADMIN_TOKEN."""
+    token = request.headers.get("X-Admin-Token", "")
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token, ADMIN_TOKEN)
+
+if ADMIN_TOKEN:
+    @app.before_request
+    def start_request_profile():
+        """
+        Sample this request's thread, and stage threads while they run its work, when
+        X-Profile is sent by an admin. Work in the analysis process pool is not sampled.
+        """
+        if "X-Profile" not in request.headers or not is_admin():
+            return None
+        if request.endpoint in PROFILE_UNSUPPORTED_ENDPOINTS:
+            return jsonify({"error": "X-Profile is not supported for streaming responses"}), 400
+        g.profile_sampler = profiler.begin_profile({threading.get_ident()}, PROFILE_INTERVAL)
+        g.profile_requested = True
+        return None
+
+    @app.after_request
+    def finish_request_profile(response):
+        """Write the request's profile and point to it from the X-Profile-File header."""
+        if not g.get("profile_requested"):
+            return response
+        sampler = g.pop("profile_sampler", None)
+        if sampler is None:
+            response.headers["X-Profile-File"] = "busy"
+            return response
+        path = profiler.write_profile(profiler.end_profile(sampler), PROFILE_DIR, "request")
+        response.headers["X-Profile-File"] = os.path.basename(path)
+        return response
+
+    @app.route("/admin/profile", methods=["GET"])
+    def profile_worker():
+        """Sample all threads of this worker for ?seconds=N and return collapsed stacks."""
+        if not is_admin():
+            return jsonify({"error": "Forbidden"}), 403
+        try:
+            seconds = min(float(request.args.get("seconds", "10")), 60.0)
+        except ValueError:
+            return jsonify({"error": "seconds must be a number"}), 400
+        collapsed = profiler.sample_for(seconds, PROFILE_INTERVAL)
+        if collapsed is None:
+            return jsonify({"error": "A profile is already in progress"}), 409
+        logger.info("Served %ss worker profile", seconds)
+        return Response(
+            collapsed,
+            mimetype="text/plain",
+            headers={"Content-Disposition": f"attachment; filename=profile-{os.getpid()}.collapsed"}
+        )
 
 # Endpoints
+# Admission control: estimate each request's cost and shed it with a 429 before any
+# analysis runs when its client is over rate or the server's in-flight budget is spent
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "1") != "0"
+MAX_PASSWORD_LENGTH = int(os.environ.get("MAX_PASSWORD_LENGTH", "1000"))
+ADMISSION_CLIENT_HEADER = os.environ.get("ADMISSION_CLIENT_HEADER")
+admission = AdmissionController(
+    client_rate=float(os.environ.get("ADMISSION_CLIENT_RATE", "50")),
+    client_burst=float(os.environ.get("ADMISSION_CLIENT_BURST", "200")),
+    max_inflight_cost=float(os.environ.get("ADMISSION_MAX_INFLIGHT_COST", str(STAGE_WORKERS * 4))),
+    max_request_cost=float(os.environ.get("ADMISSION_MAX_REQUEST_COST", "0")) or None
+)
+# Default methods of each endpoint whose cost scales with the passwords in its body
+ENDPOINT_METHODS = {
+    "analyze_password": ["zxcvbn", "ml"],
+    "batch_analyze_password": ["zxcvbn", "ml"],
+    "analyze_and_check": ["zxcvbn", "ml", "breach"],
+    "check_breach": ["breach"],
+    "batch_check_breach": ["breach"],
+}
+BATCH_ENDPOINTS = {"batch_analyze_password", "batch_check_breach"}  # Read "passwords"; the rest read "password"
+METHOD_SELECT_ENDPOINTS = {"analyze_password", "analyze_and_check"}  # Honour a "methods" field
+# Streams are charged per item as they are read (see stream_analyze); an item that
+# finds no room within this many seconds gets an error line instead of being analyzed
+ADMISSION_STREAM_WAIT = float(os.environ.get("ADMISSION_STREAM_WAIT", "10"))
+
+def admission_client_id():
+    client_id = request.headers.get(ADMISSION_CLIENT_HEADER) if ADMISSION_CLIENT_HEADER else None
+    return client_id or request.remote_addr or "unknown"
+
+def estimate_request_cost():
+    """
+    Estimated cost of the current request in admission units (0 means not charged up front)
+
+    Only body fields the endpoint's view reads are used, so extra fields cannot lower the cost.
+
+    Raises:
+        ValueError: If a password in the body exceeds MAX_PASSWORD_LENGTH
+    """
+    endpoint = request.endpoint
+    if endpoint in ENDPOINT_METHODS:
+        # Only the fields the view itself reads are trusted; every request pays at least the base cost
+        base_cost = password_cost(0, ENDPOINT_METHODS[endpoint])
+        data = request.get_json(silent=True)  # Cached, so the view does not parse again
+        if not isinstance(data, dict):
+            return base_cost  # Malformed; the view rejects it
+        methods = data.get("methods") if endpoint in METHOD_SELECT_ENDPOINTS else None
+        if not isinstance(methods, list) or not methods or not set(methods) <= set(REQUEST_METHODS):
+            methods = ENDPOINT_METHODS[endpoint]
+        passwords = data.get("passwords") if endpoint in BATCH_ENDPOINTS else [data.get("password")]
+        if not isinstance(passwords, list):
+            return base_cost  # Malformed; the view rejects it without doing any work
+        cost = 0.0
+        for password in passwords[:50]:
+            length = len(password) if isinstance(password, str) else 0
+            if length > MAX_PASSWORD_LENGTH:
+                raise ValueError(f"Passwords may be at most {MAX_PASSWORD_LENGTH} characters")
+            cost += password_cost(length, methods)
+        return max(cost, base_cost)
+    if endpoint == "generate_passwords":
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return password_cost(16, ["zxcvbn", "ml"])
+        count = data.get("count", 1)
+        length = data.get("length", 16)
+        if not isinstance(count, int) or not isinstance(length, int):
+            return password_cost(16, ["zxcvbn", "ml"])  # Malformed; the view rejects it
+        methods = ["zxcvbn", "ml", "breach"] if data.get("exclude_breached") else ["zxcvbn", "ml"]
+        return max(1, min(count, GENERATE_MAX_COUNT)) * password_cost(max(0, length), methods)
+    if endpoint == "session_analysis":
+        return password_cost(16, ["zxcvbn", "ml"])
+    if endpoint == "session_keystrokes":
+        return 0.1
+    return 0.0
+
+class AppRequest(Request):
+    """Request whose body limit is lifted for the streaming endpoint, which reads its body incrementally."""
+
+    @property
+    def max_content_length(self):
+        if self.endpoint == "stream_analyze":
+            return None
+        return super().max_content_length
+
+app.request_class = AppRequest
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("MAX_CONTENT_LENGTH", str(64 * 1024)))
+
+@app.before_request
+def admit_request():
+    """Enforce the password length cap, then charge the request's estimated cost or shed it."""
+    try:
+        cost = estimate_request_cost()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not cost or not ADMISSION_ENABLED:
+        return None
+    try:
+        g.admission_cost = admission.admit(admission_client_id(), cost)
+    except AdmissionRejected as e:
+        METRICS.inc("admission_rejected")
+        logger.warning("Shed request to %s: %s", request.path, e.reason)
+        response = jsonify({"error": e.reason})
+        response.headers["Retry-After"] = e.retry_after_header
+        return response, 429
+    return None
+
+@app.teardown_request
+def release_admission(_error=None):
+    """Return the request's cost to the in-flight budget; streams release their items themselves."""
+    cost = g.pop("admission_cost", None)
+    if cost:
+        admission.release(cost)
+
+# Traffic capture: opt-in recording of features, lengths, keyed hashes, HIBP prefixes
+# and stage timings (never passwords) for benchmarks/replay.py
+CAPTURE_PATH = os.environ.get("CAPTURE_PATH")
+CAPTURE_ENDPOINTS = {"analyze_password", "batch_analyze_password", "check_breach", "batch_check_breach",
+                     "analyze_and_check"}
+traffic_capture = None
+if CAPTURE_PATH:
+    capture_key = os.environ.get("CAPTURE_KEY", "").encode()
+    if not capture_key:
+        capture_key = os.urandom(32)
+        logger.warning("CAPTURE_KEY not set; repeated passwords are only linked within this process")
+    traffic_capture = TrafficCapture(
+        CAPTURE_PATH,
+        capture_key,
+        max_bytes=int(os.environ.get("CAPTURE_MAX_BYTES", str(10 * 1024 * 1024))),
+        backup_count=int(os.environ.get("CAPTURE_BACKUPS", "5")),
+        sample_rate=float(os.environ.get("CAPTURE_SAMPLE_RATE", "1"))
+    )
+    atexit.register(traffic_capture.close)
+
+    @app.before_request
+    def start_capture():
+        """Collect the stage timings of a sampled request to a captured endpoint."""
+        if request.endpoint in CAPTURE_ENDPOINTS and traffic_capture.sampled():
+            g.capture_started = time.perf_counter()
+            g.capture_timings, g.capture_token = record_timings()
+
+    @app.after_request
+    def note_capture_status(response):
+        if "capture_token" in g:
+            g.capture_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_capture(_error=None):
+        """Queue the request's capture record; the file is written by a background thread."""
+        token = g.pop("capture_token", None)
+        if token is None:
+            return
+        stop_recording(token)
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return  # Malformed body; there is nothing to replay
+        passwords = data.get("passwords") if request.endpoint in BATCH_ENDPOINTS else [data.get("password")]
+        methods, models = g.get("selected_analysis", (None, None))
+        traffic_capture.record(
+            request.endpoint,
+            passwords[:50] if isinstance(passwords, list) else [],
+            g.get("capture_status", 500),
+            timings=g.capture_timings,
+            elapsed=time.perf_counter() - g.capture_started,
+            methods=methods,
+            models=models
+        )
+
 @app.route("/api/analyze-password", methods=["POST"])
 def analyze_password():
     """Analyze the strength of a provided password."""
@@ -36,11 +427,23 @@ def analyze_password():
             logger.error("Empty password provided")
             return jsonify({"error": "Password cannot be empty"}), 400
         
-        result = password_analyzer.analyze_password(password)
-        logger.info(f"Analyzed password (hash prefix: {result.get('password_hash_prefix', 'N/A')})")
-        return jsonify(result), 200
+        try:
+            methods, models, compact = parse_analysis_options(data, ["zxcvbn", "ml"])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        result, breach_result = run_selected_analysis(password, methods, models)
+        logger.info("Analyzed password (hash prefix: %s)", result.get('password_hash_prefix', 'N/A'))
+        if compact:
+            return json_response(compact_view(result, breach_result))
+        if breach_result is not None:
+            result["breach_check"] = breach_result
+            if breach_result.get("timed_out"):
+                result["partial"] = True
+        return json_response(result)
+    except PoolBusyError as e:
+        return pool_busy_response(e)
     except Exception as e:
-        logger.error(f"Error analyzing password: {str(e)}")
+        logger.error("Error analyzing password: %s", e)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 @app.route("/api/check-breach", methods=["POST"])
@@ -54,10 +457,10 @@ def check_breach():
             return jsonify({"error": "Password cannot be empty"}), 400
         
         result = breach_checker.check_password_breach(password)
-        logger.info(f"Checked password for breaches (is_breached: {result.get('is_breached', False)})")
-        return jsonify(result), 200
+        logger.info("Checked password for breaches (is_breached: %s)", result.get('is_breached', False))
+        return json_response(result)
     except Exception as e:
-        logger.error(f"Error checking breach: {str(e)}")
+        logger.error("Error checking breach: %s", e)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 @app.route("/api/batch-check-breach", methods=["POST"])
@@ -66,6 +469,9 @@ def batch_check_breach():
     try:
         data = request.get_json()
         passwords = data.get("passwords", [])
+        if not isinstance(passwords, list) or not all(isinstance(password, str) for password in passwords):
+            logger.error("Invalid password list provided")
+            return jsonify({"error": "passwords must be a list of strings"}), 400
         if not passwords:
             logger.error("Empty password list provided")
             return jsonify({"error": "Password list cannot be empty"}), 400
@@ -74,10 +480,35 @@ def batch_check_breach():
             return jsonify({"error": "Too many passwords (max 50)"}), 400
         
         results = breach_checker.batch_check_breaches(passwords)
-        logger.info(f"Batch checked {len(passwords)} passwords for breaches")
-        return jsonify(results), 200
+        logger.info("Batch checked %s passwords for breaches", len(passwords))
+        return json_response(results)
     except Exception as e:
-        logger.error(f"Error in batch breach check: {str(e)}")
+        logger.error("Error in batch breach check: %s", e)
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+@app.route("/api/batch-analyze-password", methods=["POST"])
+def batch_analyze_password():
+    """Analyze the strength of multiple passwords."""
+    try:
+        data = request.get_json()
+        passwords = data.get("passwords", [])
+        if not isinstance(passwords, list) or not all(isinstance(password, str) for password in passwords):
+            logger.error("Invalid password list provided")
+            return jsonify({"error": "passwords must be a list of strings"}), 400
+        if not passwords:
+            logger.error("Empty password list provided")
+            return jsonify({"error": "Password list cannot be empty"}), 400
+        if len(passwords) > 50:
+            logger.error("Too many passwords provided")
+            return jsonify({"error": "Too many passwords (max 50)"}), 400
+
+        results = password_analyzer.analyze_batch(passwords)
+        logger.info("Batch analyzed %s passwords", len(passwords))
+        return json_response(results)
+    except PoolBusyError as e:
+        return pool_busy_response(e)
+    except Exception as e:
+        logger.error("Error in batch analysis: %s", e)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 @app.route("/api/analyze-and-check", methods=["POST"])
@@ -90,38 +521,270 @@ def analyze_and_check():
             logger.error("Empty password provided")
             return jsonify({"error": "Password cannot be empty"}), 400
         
-        analysis_result = password_analyzer.analyze_password(password)
-        breach_result = breach_checker.check_password_breach(password)
-        logger.info(f"Analyzed and checked password (hash prefix: {analysis_result.get('password_hash_prefix', 'N/A')}, is_breached: {breach_result.get('is_breached', False)})")
-        combined_result = {
-            "analysis": analysis_result,
-            "breach_check": breach_result
-        }
-        return jsonify(combined_result), 200
+        try:
+            methods, models, compact = parse_analysis_options(data, ["zxcvbn", "ml", "breach"])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        analysis_result, breach_result = run_selected_analysis(password, methods, models)
+        logger.info("Analyzed and checked password (hash prefix: %s, is_breached: %s)",
+                    analysis_result.get('password_hash_prefix', 'N/A'), (breach_result or {}).get('is_breached', False))
+        if compact:
+            return json_response(compact_view(analysis_result, breach_result))
+        combined_result = {"analysis": analysis_result}
+        if breach_result is not None:
+            combined_result["breach_check"] = breach_result
+        if analysis_result.get("partial") or (breach_result or {}).get("timed_out"):
+            combined_result["partial"] = True
+        return json_response(combined_result)
+    except PoolBusyError as e:
+        return pool_busy_response(e)
+    except Exception as e:
+        logger.error("Error in analyze-and-check: %s", e)
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+def analyze_stream_item(index, line, check_breach):
+    """Analyze one NDJSON input line: a JSON string, {"password": ...} or {"sha1": ...}."""
+    try:
+        item = json.loads(line)
+    except ValueError:
+        return {"index": index, "error": "Invalid JSON line"}
+    if isinstance(item, str):
+        item = {"password": item}
+    if not isinstance(item, dict) or not (item.get("password") or item.get("sha1")):
+        return {"index": index, "error": "Expected a password string, {\"password\": ...} or {\"sha1\": ...}"}
+    result = {"index": index}
+    if item.get("password"):
+        password = item["password"]
+        result["analysis"] = password_analyzer.analyze_password(password)
+        if check_breach:
+            result["breach_check"] = breach_checker.check_password_breach(password)
+    else:
+        # Only the breach check is possible without the plaintext
+        result["breach_check"] = breach_checker.check_hash_breach(item["sha1"])
+    return result
+
+def read_stream_lines(stream):
+    """Yield non-empty input lines, replacing over-long lines with None without buffering them."""
+    while True:
+        line = stream.readline(STREAM_MAX_LINE + 1)
+        if not line:
+            return
+        if len(line) > STREAM_MAX_LINE and not line.endswith(b"\n"):
+            # Skip the remainder of the over-long line in bounded reads
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(STREAM_MAX_LINE + 1)
+            yield None
+        elif line.strip():
+            yield line
+
+@app.route("/api/stream-analyze", methods=["POST"])
+def stream_analyze():
+    """
+    Analyze an NDJSON (optionally chunked) request body and stream NDJSON results.
+
+    Results are emitted in input order as soon as each completes. At most
+    STREAM_WINDOW items are in flight, and input is only read as output is
+    consumed, so server memory stays constant regardless of body size.
+    Pass ?breach=false to skip breach checks for plaintext items.
+    """
+    check_breach = request.args.get("breach", "true").lower() != "false"
+    stream = request.stream
+    client_id = admission_client_id()
+    item_cost = password_cost(16, ["zxcvbn", "ml", "breach"] if check_breach else ["zxcvbn", "ml"])
+
+    def emit(entry):
+        index, future, cost = entry
+        try:
+            result = future.result()
+        except PoolBusyError as e:
+            logger.warning("Stream item %s rejected: %s", index, e)
+            result = {"index": index, "error": "Server busy, please retry shortly"}
+        except Exception as e:
+            logger.error("Error analyzing stream item %s: %s", index, e)
+            result = {"index": index, "error": "Internal server error"}
+        finally:
+            if cost:
+                admission.release(cost)
+        return app.json.dumps(result) + "\n"
+
+    def generate():
+        # Each entry is (index, future, admission cost charged for it); a cost is released once
+        # its result is written, or in the finally when the client goes away mid-stream
+        window = deque()
+        processed = 0
+        try:
+            for index, line in enumerate(read_stream_lines(stream)):
+                if len(window) >= STREAM_WINDOW:
+                    yield emit(window.popleft())
+                    processed += 1
+                cost = 0.0
+                future = Future()
+                if line is None:
+                    future.set_result({"index": index, "error": f"Line exceeds {STREAM_MAX_LINE} bytes"})
+                else:
+                    try:
+                        if ADMISSION_ENABLED:
+                            cost = admission.admit_wait(client_id, item_cost, ADMISSION_STREAM_WAIT)
+                    except AdmissionRejected as e:
+                        METRICS.inc("admission_rejected")
+                        future.set_result({"index": index, "error": e.reason,
+                                           "retry_after": e.retry_after_header})
+                    else:
+                        future = stream_executor.submit(
+                            contextvars.copy_context().run, analyze_stream_item, index, line, check_breach)
+                window.append((index, future, cost))
+            while window:
+                yield emit(window.popleft())
+                processed += 1
+        finally:
+            for _index, _future, cost in window:
+                if cost:
+                    admission.release(cost)
+        logger.info("Streamed analysis of %s items", processed)
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+@app.route("/api/generate-passwords", methods=["POST"])
+def generate_passwords():
+    """Generate passwords that meet a length, character class, score and breach policy."""
+    try:
+        data = request.get_json() or {}
+        count = data.get("count", 1)
+        exclude_breached = bool(data.get("exclude_breached", False))
+        max_count = GENERATE_MAX_BREACH_CHECKED if exclude_breached else GENERATE_MAX_COUNT
+        if not isinstance(count, int) or count < 1 or count > max_count:
+            suffix = " with exclude_breached" if exclude_breached else ""
+            return jsonify({"error": f"count must be between 1 and {max_count}{suffix}"}), 400
+        classes = data.get("classes")
+        if classes is not None and (not isinstance(classes, list)
+                                    or not all(isinstance(name, str) for name in classes)):
+            return jsonify({"error": "classes must be a list of character class names"}), 400
+        try:
+            result = password_analyzer.generate_passwords(
+                count,
+                length=int(data.get("length", 16)),
+                classes=classes,
+                min_score=float(data.get("min_score", 60)),
+                exclude_breached=exclude_breached,
+                breach_checker=breach_checker
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        logger.info("Generated %s/%s passwords", len(result['passwords']), count)
+        return json_response(result)
+    except PoolBusyError as e:
+        return pool_busy_response(e)
+    except Exception as e:
+        logger.error("Error generating passwords: %s", e)
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+@app.route("/api/sessions", methods=["POST"])
+def create_session():
+    """Start an incremental keystroke analysis session."""
+    session = session_store.create()
+    return jsonify({
+        "session_id": session.session_id,
+        "debounce_ms": int(SESSION_DEBOUNCE * 1000),
+        "ttl": session_store.ttl
+    }), 201
+
+@app.route("/api/sessions/<session_id>/keystrokes", methods=["POST"])
+def session_keystrokes(session_id):
+    """
+    Apply an edit to a session and return its rule-based features immediately.
+
+    Body: {"append": "text"}, {"delete": n} (characters from the end) or
+    {"value": "full value"} for edits elsewhere in the string.
+    """
+    try:
+        session = session_store.get(session_id)
+        if session is None:
+            return jsonify({"error": "Session not found or expired"}), 404
+        data = request.get_json() or {}
+        append, delete, value = data.get("append"), data.get("delete"), data.get("value")
+        if append is None and delete is None and value is None:
+            return jsonify({"error": "Provide append, delete or value"}), 400
+        if (append is not None and not isinstance(append, str)) or \
+                (value is not None and not isinstance(value, str)) or \
+                (delete is not None and (not isinstance(delete, int) or delete < 0)):
+            return jsonify({"error": "append/value must be strings and delete a non-negative integer"}), 400
+        with session.lock:
+            session.apply(append=append, delete=delete, value=value)
+            features = session.features.features()
+            version = session.version
+            analysis_ready = session.analysis_version == version
+        return jsonify({
+            "version": version,
+            "features": features,
+            "feedback": generate_feedback(features) if features["length"] else [],
+            "analysis_ready": analysis_ready
+        }), 200
     except Exception as e:
-        logger.error(f"Error in analyze-and-check: {str(e)}")
+        logger.error("Error applying keystroke: %s", e)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
+@app.route("/api/sessions/<session_id>/analysis", methods=["GET"])
+def session_analysis(session_id):
+    """Full analysis of the session's current value, once typing has gone idle."""
+    try:
+        session = session_store.get(session_id)
+        if session is None:
+            return jsonify({"error": "Session not found or expired"}), 404
+        with session.lock:
+            version = session.version
+            if session.analysis_version == version:
+                return json_response({"version": version, "analysis": session.analysis})
+            remaining = SESSION_DEBOUNCE - session.idle_for()
+            if remaining > 0:
+                retry_ms = int(remaining * 1000) + 1
+                response = jsonify({"pending": True, "version": version, "retry_after_ms": retry_ms})
+                response.headers["Retry-After"] = str(max(1, round(remaining)))
+                return response, 202
+            if not len(session.features):
+                return jsonify({"error": "Password cannot be empty"}), 400
+            value, features = session.features.value, session.features.features()
+        # Analyze outside the lock so keystrokes for this session aren't held up behind it
+        analysis = password_analyzer.analyze_password(value, features=features)
+        with session.lock:
+            if session.analysis_version < version:
+                session.analysis, session.analysis_version = analysis, version
+        return json_response({"version": version, "analysis": analysis})
+    except PoolBusyError as e:
+        return pool_busy_response(e)
+    except Exception as e:
+        logger.error("Error analyzing session: %s", e)
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+@app.route("/api/sessions/<session_id>", methods=["DELETE"])
+def delete_session(session_id):
+    """End a session and drop its state."""
+    if not session_store.delete(session_id):
+        return jsonify({"error": "Session not found or expired"}), 404
+    return "", 204
+
 @app.route("/health", methods=["GET"])
 def health_check():
     """Health check endpoint for monitoring."""
     try:
         model_status = "Models loaded" if password_analyzer.models else "No models loaded"
-        api_status = "API accessible"
-        try:
-            response = requests.head("https://api.pwnedpasswords.com/range/00000", timeout=5)
-            if response.status_code != 200:
-                api_status = "API connectivity issue"
-        except requests.exceptions.RequestException:
-            api_status = "API connectivity unavailable"
+        probe = breach_probe.status()
         return jsonify({
             "status": "healthy",
             "model_status": model_status,
-            "breach_api_status": api_status
+            "ml_mode": password_analyzer.config["ml_mode"] if password_analyzer.student_info else "ensemble",
+            "breach_api_status": probe["status"],
+            "breach_api_checked_at": probe["checked_at"],
+            "breach_api_latency_ms": probe["latency_ms"],
+            "breach_circuit": breach_checker.breaker.snapshot()
         }), 200
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
+        logger.error("Health check failed: %s", e)
         return jsonify({"error": "Service unhealthy"}), 503
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Expose stage latency histograms and breach counters in Prometheus text format."""
+    return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8000, debug=False)  # Set debug=False for production
\ No newline at end of file
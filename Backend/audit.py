@@ -0,0 +1,265 @@
+"""
+Bulk Password Audit
+Streams a password file (one per line) through PasswordAnalyzer and, optionally,
+BreachChecker on every core, writing results incrementally and checkpointing so an
+interrupted run resumes where it stopped
+
+Plaintext passwords are never written; rows carry the input line number and the
+same SHA-256 hash prefix the API logs.
+
+Usage (from the directory that contains models/):
+
+    python Backend/audit.py dump.txt --output audit.csv --breach
+    python Backend/audit.py dump.txt --output audit_parquet --format parquet --workers 8
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from src.password_analyzer import PasswordAnalyzer
+from src.breach_checker import BreachChecker
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = [
+    'line', 'hash_prefix', 'length', 'overall_score', 'overall_strength',
+    'zxcvbn_score', 'ml_score', 'is_breached', 'breach_count', 'error'
+]
+
+# Per-process state created once by _init_worker
+_analyzer = None
+_breach_checker = None
+
+
+def _init_worker(check_breach, hibp_url, hibp_delay, ml_mode):
+    """Load the models (and breach checker) once per worker process."""
+    global _analyzer, _breach_checker
+    # Ctrl+C is handled by the parent, which checkpoints and shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(level=logging.WARNING)
+    _analyzer = PasswordAnalyzer(config={'ml_mode': ml_mode})
+    if check_breach:
+        _breach_checker = BreachChecker(api_url=hibp_url, request_delay=hibp_delay, batch_delay=0)
+
+
+def _audit_chunk(first_line, passwords):
+    """Analyze one chunk of passwords and return its output rows."""
+    rows = []
+    for offset, (password, result) in enumerate(zip(passwords, _analyzer.analyze_batch(passwords))):
+        row = dict.fromkeys(COLUMNS, '')
+        row['line'] = first_line + offset
+        if 'error' in result:
+            row['error'] = result['error']
+            rows.append(row)
+            continue
+        row['hash_prefix'] = result['password_hash_prefix']
+        row['length'] = result['length']
+        row['overall_score'] = result.get('overall', {}).get('score', '')
+        row['overall_strength'] = result.get('overall', {}).get('strength', '')
+        row['zxcvbn_score'] = result['analyses']['zxcvbn'].get('score', '')
+        model_scores = [
+            prediction['score'] for prediction in result['analyses']['ml_models'].get('predictions', {}).values()
+            if 'score' in prediction
+        ]
+        if model_scores:
+            row['ml_score'] = round(sum(model_scores) / len(model_scores), 2)
+        if _breach_checker:
+            breach = _breach_checker.check_password_breach(password)
+            if 'error' in breach:
+                row['error'] = f"breach check: {breach['error']}"
+            else:
+                row['is_breached'] = breach['is_breached']
+                row['breach_count'] = breach['breach_count']
+        rows.append(row)
+    return rows
+
+
+def read_chunks(input_path, start_offset, first_line, chunk_size):
+    """
+    Stream the input file from a byte offset in chunks
+
+    Yields:
+        tuple: (first line number, passwords, byte offset just past the chunk)
+    """
+    with open(input_path, 'rb') as f:
+        f.seek(start_offset)
+        passwords = []
+        line_number = first_line
+        while True:
+            raw = f.readline()
+            if raw:
+                passwords.append(raw.rstrip(b'\r\n').decode('utf-8', errors='replace'))
+            if passwords and (len(passwords) == chunk_size or not raw):
+                yield line_number, passwords, f.tell()
+                line_number += len(passwords)
+                passwords = []
+            if not raw:
+                return
+
+
+class CsvSink:
+    """Appends rows to one CSV file; resume truncates it back to the checkpointed size."""
+
+    def __init__(self, path, resume_bytes):
+        if os.path.exists(path):
+            # Drop rows written after the last checkpoint so they are not duplicated
+            os.truncate(path, resume_bytes)
+        self.file = open(path, 'a', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=COLUMNS)
+        if resume_bytes == 0:
+            self.writer.writeheader()
+
+    def write(self, rows, _chunk_index):
+        self.writer.writerows(rows)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def position(self):
+        return os.fstat(self.file.fileno()).st_size
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """Writes each chunk as a numbered Parquet part file, so resuming just rewrites later parts."""
+
+    def __init__(self, path):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)")
+        import pandas as pd
+        self.pd = pd
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, rows, chunk_index):
+        frame = self.pd.DataFrame(rows, columns=COLUMNS).astype({'error': str})
+        frame.to_parquet(os.path.join(self.path, f"part-{chunk_index:08d}.parquet"), index=False)
+
+    def position(self):
+        return 0
+
+    def close(self):
+        pass
+
+
+def load_checkpoint(path):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {'input_offset': 0, 'next_line': 1, 'next_chunk': 0, 'output_bytes': 0, 'rows_written': 0}
+
+
+def save_checkpoint(path, state):
+    """Write the checkpoint atomically so a crash mid-write never corrupts it."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def run_audit(args):
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint.json"
+    state = load_checkpoint(checkpoint_path)
+    if state['rows_written']:
+        print(f"Resuming at line {state['next_line']} ({state['rows_written']} rows already written)", file=sys.stderr)
+    if args.format == 'csv':
+        sink = CsvSink(args.output, state['output_bytes'])
+    else:
+        sink = ParquetSink(args.output)
+
+    workers = args.workers or os.cpu_count() or 1
+    max_inflight = args.max_inflight or workers * 2
+    started = time.monotonic()
+    last_report = started
+    rows_at_start = state['rows_written']
+    inflight = deque()
+
+    def drain_one():
+        nonlocal last_report
+        chunk_index, end_offset, next_line, future = inflight.popleft()
+        rows = future.result()
+        sink.write(rows, chunk_index)
+        state.update({
+            'input_offset': end_offset,
+            'next_line': next_line,
+            'next_chunk': chunk_index + 1,
+            'output_bytes': sink.position(),
+            'rows_written': state['rows_written'] + len(rows)
+        })
+        save_checkpoint(checkpoint_path, state)
+        now = time.monotonic()
+        if now - last_report >= args.progress_interval:
+            rate = (state['rows_written'] - rows_at_start) / (now - started)
+            print(f"{state['rows_written']:>12,} rows  {rate:>10,.0f} passwords/s", file=sys.stderr)
+            last_report = now
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(args.breach, args.hibp_url, args.hibp_delay, args.ml_mode)
+    )
+    try:
+        chunk_index = state['next_chunk']
+        for first_line, passwords, end_offset in read_chunks(
+                args.input, state['input_offset'], state['next_line'], args.chunk_size):
+            # Bounded window: never more than max_inflight chunks read but unwritten
+            if len(inflight) >= max_inflight:
+                drain_one()
+            future = executor.submit(_audit_chunk, first_line, passwords)
+            inflight.append((chunk_index, end_offset, first_line + len(passwords), future))
+            chunk_index += 1
+        while inflight:
+            drain_one()
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; rerun the same command to resume from line {state['next_line']}", file=sys.stderr)
+        executor.shutdown(wait=False, cancel_futures=True)
+        sink.close()
+        return 130
+    executor.shutdown()
+    sink.close()
+
+    elapsed = time.monotonic() - started
+    audited = state['rows_written'] - rows_at_start
+    print(f"Audited {audited:,} passwords in {elapsed:.1f}s ({audited / max(elapsed, 1e-9):,.0f}/s); "
+          f"{state['rows_written']:,} rows in {args.output}", file=sys.stderr)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Audit a password list for strength and breaches')
+    parser.add_argument('input', help='Text file with one password per line')
+    parser.add_argument('--output', required=True, help='CSV file, or directory of Parquet parts')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: <output>.checkpoint.json)')
+    parser.add_argument('--workers', type=int, default=0, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Passwords per task (default: 1000)')
+    parser.add_argument('--max-inflight', type=int, default=0,
+                        help='Chunks read ahead of the writer (default: 2 per worker); bounds memory')
+    parser.add_argument('--ml-mode', choices=['ensemble', 'student'], default='ensemble',
+                        help='Score with every model or the distilled student model (default: ensemble)')
+    parser.add_argument('--breach', action='store_true', help='Also check each password against HIBP')
+    parser.add_argument('--hibp-url', default='https://api.pwnedpasswords.com/range/')
+    parser.add_argument('--hibp-delay', type=float, default=0.0,
+                        help='Seconds between upstream range requests per worker (default: 0)')
+    parser.add_argument('--progress-interval', type=float, default=5.0, help='Seconds between progress lines')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    return run_audit(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+HIBP Stub Server
+Local stand-in for the Have I Been Pwned range API with configurable latency and 429 rate
+"""
+
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _fake_suffixes(prefix, count):
+    """Deterministic filler suffixes so every prefix returns a realistically sized body."""
+    return [
+        hashlib.sha1(f"{prefix}:{i}".encode()).hexdigest().upper()[5:]
+        for i in range(count)
+    ]
+
+
+class HIBPStub:
+    """
+    Threaded HTTP server answering GET/HEAD /range/<prefix>
+
+    Args:
+        latency (float): Seconds to sleep before answering each request
+        rate_429 (float): Fraction of requests answered with 429 Too Many Requests
+        breached (dict): Password -> breach count to embed in the responses
+        entries_per_prefix (int): Filler entries per response (real responses carry ~800)
+        seed (int): Seed for the 429 decisions so runs are repeatable
+    """
+
+    def __init__(self, latency=0.0, rate_429=0.0, breached=None, entries_per_prefix=800, seed=0,
+                 host='127.0.0.1', port=0):
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.entries_per_prefix = entries_per_prefix
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._breached = {}
+        for password, count in (breached or {}).items():
+            digest = hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
+            self._breached.setdefault(digest[:5], {})[digest[5:]] = count
+        self._bodies = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL to assign to BreachChecker.api_url."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/range/"
+
+    def body_for(self, prefix):
+        """Build (and memoize) the response body for a prefix."""
+        body = self._bodies.get(prefix)
+        if body is None:
+            lines = [f"{suffix}:{(i % 50) + 1}" for i, suffix in enumerate(_fake_suffixes(prefix, self.entries_per_prefix))]
+            lines.extend(f"{suffix}:{count}" for suffix, count in self._breached.get(prefix, {}).items())
+            body = self._bodies[prefix] = '\r\n'.join(lines).encode()
+        return body
+
+    def _should_throttle(self):
+        with self._lock:
+            self.requests += 1
+            return self.rate_429 > 0 and self._random.random() < self.rate_429
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self, include_body):
+                if stub.latency:
+                    time.sleep(stub.latency)
+                prefix = self.path.rsplit('/', 1)[-1].upper()
+                if not self.path.startswith('/range/') or len(prefix) != 5:
+                    status, body = 404, b'Not found'
+                elif stub._should_throttle():
+                    status, body = 429, b'Rate limit exceeded'
+                else:
+                    status, body = 200, stub.body_for(prefix)
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/plain')
+                self.send_header('Content-Length', str(len(body)))
+                if status == 429:
+                    self.send_header('Retry-After', '1')
+                self.end_headers()
+                if include_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(include_body=True)
+
+            def do_HEAD(self):
+                self._respond(include_body=False)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='hibp-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run a local HIBP range API stub')
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of added latency per request')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Fraction of requests answered with 429')
+    args = parser.parse_args()
+    stub = HIBPStub(latency=args.latency, rate_429=args.rate_429, port=args.port).start()
+    print(f"HIBP stub listening at {stub.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
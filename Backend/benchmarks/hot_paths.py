@@ -0,0 +1,194 @@
+"""
+Hot Path Microbenchmarks
+Times the analyzer and breach checker hot paths on fixed, seeded password corpora
+and fails when a path regresses beyond a threshold against the stored baseline
+
+Run from the directory that contains models/ (the repository root):
+
+    python Backend/benchmarks/hot_paths.py                     # compare with baseline.json
+    python Backend/benchmarks/hot_paths.py --update-baseline   # record a new baseline
+
+Timings are only comparable on the machine that recorded the baseline: regenerate
+baseline.json with --update-baseline on each machine (or CI runner class) you gate on.
+"""
+
+import argparse
+import copy
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import string
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from src.password_analyzer import PasswordAnalyzer, check_password_features, sanitize_input  # noqa: E402
+from src.breach_checker import BreachChecker  # noqa: E402
+from hibp_stub import HIBPStub  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+CORPUS_SEED = 1337
+CORPUS_LENGTHS = (8, 16, 32, 64, 128)
+CORPUS_SIZE = 40
+COMMON_FRAGMENTS = ['password', '123456', 'qwe', 'abc', 'admin', '!@#', 'zxc']
+SPECIALS = '!@#$%^&*(),.?":{}|<>'
+
+
+def build_corpus(length, size=CORPUS_SIZE, seed=CORPUS_SEED):
+    """Seeded passwords of one length: random mixes with common fragments and runs spliced in."""
+    rng = random.Random(seed * 1000 + length)
+    alphabet = string.ascii_letters + string.digits + SPECIALS
+    corpus = []
+    for i in range(size):
+        chars = [rng.choice(alphabet) for _ in range(length)]
+        if i % 3 == 0:
+            fragment = rng.choice(COMMON_FRAGMENTS)[:length]
+            start = rng.randrange(0, length - len(fragment) + 1)
+            chars[start:start + len(fragment)] = fragment
+        elif i % 3 == 1 and length >= 4:
+            start = rng.randrange(0, length - 3)
+            chars[start:start + 3] = chars[start] * 3
+        corpus.append(''.join(chars))
+    return corpus
+
+
+def calibrate(func, corpus, min_round_seconds=0.2):
+    """Warm a case up and return how many passes over its corpus make one round last `min_round_seconds`."""
+    for password in corpus:
+        func(password)  # warm-up: caches, lazy imports, branch predictors
+    start = time.perf_counter()
+    for password in corpus:
+        func(password)
+    elapsed = time.perf_counter() - start
+    return max(1, int(min_round_seconds / max(elapsed, 1e-9)))
+
+
+def time_round(func, corpus, loops):
+    """Per-call time in microseconds over `loops` passes of the corpus."""
+    start = time.perf_counter()
+    for _ in range(loops):
+        for password in corpus:
+            func(password)
+    return (time.perf_counter() - start) / (loops * len(corpus)) * 1e6
+
+
+def time_cases(cases, rounds, min_round_seconds=0.2):
+    """
+    Median and best per-call times in microseconds for each case
+
+    Rounds are interleaved (round 1 of every case, then round 2, ...) so a burst of
+    machine noise lands on one round of many cases rather than every round of one
+    case, and the median round each case is judged on leaves it out.
+    """
+    loops = {name: calibrate(func, corpus, min_round_seconds) for name, (func, corpus) in cases.items()}
+    timings = {name: [] for name in cases}
+    for _ in range(rounds):
+        for name, (func, corpus) in cases.items():
+            timings[name].append(time_round(func, corpus, loops[name]))
+    return {
+        name: {'median_us': round(statistics.median(values), 3), 'min_us': round(min(values), 3)}
+        for name, values in timings.items()
+    }
+
+
+def build_cases(analyzer, stub):
+    """Map case name -> (callable, corpus)."""
+    corpora = {length: build_corpus(length) for length in CORPUS_LENGTHS}
+    mixed = [password for length in CORPUS_LENGTHS for password in corpora[length][:8]]
+    cases = {}
+    for length, corpus in corpora.items():
+        cases[f'sanitize_input[{length}]'] = (sanitize_input, corpus)
+        cases[f'check_password_features[{length}]'] = (check_password_features, corpus)
+        cases[f'extract_features[{length}]'] = (analyzer.extract_features, corpus)
+        cases[f'zxcvbn_analysis[{length}]'] = (analyzer.zxcvbn_analysis, corpus)
+    for model_name, model in analyzer.models.items():
+        single = copy.copy(analyzer)
+        single.models = {model_name: model}
+        cases[f'ml_analysis[{model_name}]'] = (single.ml_analysis, mixed)
+    cases['analyze_password[mixed]'] = (analyzer.analyze_password, mixed)
+
+    uncached = BreachChecker(cache_size=0)
+    cached = BreachChecker()
+    for checker in (uncached, cached):
+        checker.api_url = stub.url
+        checker.request_delay = 0
+    for password in mixed:
+        cached.check_password_breach(password)
+    cases['check_password_breach[stub_uncached]'] = (uncached.check_password_breach, mixed)
+    cases['check_password_breach[cached]'] = (cached.check_password_breach, mixed)
+    return cases
+
+
+def compare(results, baseline, max_regression):
+    """Return (case, baseline_us, current_us, change_pct) for each case slower than allowed."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        change = (current['median_us'] - previous['median_us']) / previous['median_us'] * 100
+        if change > max_regression:
+            regressions.append((name, previous['median_us'], current['median_us'], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run hot path microbenchmarks')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='Write results to the baseline file')
+    parser.add_argument('--max-regression', type=float, default=25.0,
+                        help='Allowed slowdown of a case in percent before failing (default: 25)')
+    parser.add_argument('--rounds', type=int, default=11, help='Timed rounds per case (default: 11)')
+    parser.add_argument('--filter', default='', help='Only run cases whose name contains this string')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    analyzer = PasswordAnalyzer()
+    with HIBPStub() as stub:
+        cases = {name: case for name, case in build_cases(analyzer, stub).items() if args.filter in name}
+        results = time_cases(cases, args.rounds)
+    for name, result in results.items():
+        print(f"{name:<45} {result['median_us']:>12.1f} us/call (min {result['min_us']:.1f})")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'machine': platform.machine(),
+                    'host': platform.node(),
+                    'cpus': os.cpu_count(),
+                    'corpus_seed': CORPUS_SEED,
+                    'rounds': args.rounds
+                },
+                'results': results
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline first")
+        return 1
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    recorded_on = baseline['meta'].get('host')
+    if recorded_on and recorded_on != platform.node():
+        print(f"WARNING: baseline was recorded on {recorded_on}; regenerate it on this machine "
+              "with --update-baseline before trusting the comparison")
+    regressions = compare(results, baseline['results'], args.max_regression)
+    for name, previous, current, change in regressions:
+        print(f"REGRESSION {name}: {previous:.1f} -> {current:.1f} us/call (+{change:.1f}%)")
+    if regressions:
+        return 1
+    print(f"No case regressed more than {args.max_regression}%")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
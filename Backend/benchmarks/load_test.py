@@ -0,0 +1,192 @@
+"""
+Load Test Harness
+Drives the API endpoints at a configurable concurrency and mix against a local
+HIBP stub and reports throughput, p50/p95/p99 latency and error rates
+
+Run from the directory that contains models/ (the repository root):
+
+    # Start the app in-process, wired to the stub
+    python Backend/benchmarks/load_test.py --concurrency 16 --duration 30
+
+    # Drive an already running server; start it with HIBP_API_URL pointing at the stub
+    HIBP_API_URL=http://127.0.0.1:8787/range/ HIBP_REQUEST_DELAY=0 HIBP_BATCH_DELAY=0 python Backend/app.py
+    python Backend/benchmarks/load_test.py --url http://localhost:8000 --stub-port 8787
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from hibp_stub import HIBPStub  # noqa: E402
+from hot_paths import CORPUS_LENGTHS, build_corpus  # noqa: E402
+
+ENDPOINTS = {
+    'analyze-password': '/api/analyze-password',
+    'check-breach': '/api/check-breach',
+    'batch-check-breach': '/api/batch-check-breach',
+    'analyze-and-check': '/api/analyze-and-check',
+}
+DEFAULT_MIX = 'analyze-password=4,check-breach=2,batch-check-breach=1,analyze-and-check=3'
+
+
+def parse_mix(mix):
+    """Parse 'endpoint=weight,...' into a {endpoint: weight} dict."""
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name} (choose from {', '.join(ENDPOINTS)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct * len(sorted_values) / 100) - 1))
+    return sorted_values[rank]
+
+
+def start_local_app(stub_url):
+    """Import the app wired to the stub and serve it from a background thread; returns (base_url, server)."""
+    from werkzeug.serving import make_server
+
+    os.environ['HIBP_API_URL'] = stub_url
+    os.environ.setdefault('HIBP_REQUEST_DELAY', '0')
+    os.environ.setdefault('HIBP_BATCH_DELAY', '0')
+    # All clients share one address; measure the server itself unless shedding is asked for
+    os.environ.setdefault('ADMISSION_ENABLED', '0')
+    import app as app_module
+
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='load-test-app', daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+class LoadGenerator:
+    """Closed-loop load: each worker thread sends its next request as soon as the previous one returns."""
+
+    def __init__(self, base_url, weights, concurrency, duration, batch_size, seed):
+        self.base_url = base_url.rstrip('/')
+        self.endpoints = list(weights)
+        self.weights = [weights[name] for name in self.endpoints]
+        self.concurrency = concurrency
+        self.duration = duration
+        self.batch_size = batch_size
+        self.seed = seed
+        self.passwords = [password for length in CORPUS_LENGTHS for password in build_corpus(length)]
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _payload(self, endpoint, rng):
+        if endpoint == 'batch-check-breach':
+            return {'passwords': rng.sample(self.passwords, self.batch_size)}
+        return {'password': rng.choice(self.passwords)}
+
+    def _worker(self, index, deadline):
+        rng = random.Random(self.seed + index)
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            endpoint = rng.choices(self.endpoints, self.weights)[0]
+            start = time.perf_counter()
+            try:
+                response = session.post(f"{self.base_url}{ENDPOINTS[endpoint]}",
+                                        json=self._payload(endpoint, rng), timeout=60)
+                # A 200 can still carry a failed stage (e.g. an upstream 429 in the breach check)
+                failed = response.status_code >= 400 or '"error"' in response.text
+            except requests.exceptions.RequestException:
+                failed = True
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies[endpoint].append(elapsed)
+                if failed:
+                    self.errors[endpoint] += 1
+
+    def run(self):
+        deadline = time.monotonic() + self.duration
+        threads = [threading.Thread(target=self._worker, args=(i, deadline)) for i in range(self.concurrency)]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.report(time.monotonic() - start)
+
+    def report(self, elapsed):
+        rows = {}
+        for endpoint in self.endpoints + ['total']:
+            if endpoint == 'total':
+                values = sorted(v for values in self.latencies.values() for v in values)
+                errors = sum(self.errors.values())
+            else:
+                values = sorted(self.latencies[endpoint])
+                errors = self.errors[endpoint]
+            rows[endpoint] = {
+                'requests': len(values),
+                'throughput_rps': round(len(values) / elapsed, 2),
+                'p50_ms': round(percentile(values, 50) * 1000, 2),
+                'p95_ms': round(percentile(values, 95) * 1000, 2),
+                'p99_ms': round(percentile(values, 99) * 1000, 2),
+                'error_rate': round(errors / len(values), 4) if values else 0.0
+            }
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the password analyzer API')
+    parser.add_argument('--url', help='Base URL of a running server (default: start the app in-process)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent client threads (default: 8)')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to run (default: 20)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Endpoint weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--batch-size', type=int, default=5, help='Passwords per batch-check-breach request')
+    parser.add_argument('--stub-port', type=int, default=0, help='Port for the HIBP stub (default: random)')
+    parser.add_argument('--stub-latency', type=float, default=0.05, help='Seconds of stub latency per request')
+    parser.add_argument('--stub-429-rate', type=float, default=0.0, help='Fraction of stub requests answered 429')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the request mix and payloads')
+    parser.add_argument('--json', help='Also write the report to this JSON file')
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    stub = HIBPStub(latency=args.stub_latency, rate_429=args.stub_429_rate, seed=args.seed, port=args.stub_port)
+    stub.start()
+    server = None
+    try:
+        if args.url:
+            base_url = args.url
+        else:
+            base_url, server = start_local_app(stub.url)
+        print(f"Driving {base_url} with {args.concurrency} clients for {args.duration}s (stub at {stub.url})")
+        report = LoadGenerator(base_url, weights, args.concurrency, args.duration,
+                               args.batch_size, args.seed).run()
+    finally:
+        if server:
+            server.shutdown()
+        stub.stop()
+
+    print(f"\n{'endpoint':<22}{'requests':>10}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for endpoint, row in report.items():
+        print(f"{endpoint:<22}{row['requests']:>10}{row['throughput_rps']:>10.1f}{row['p50_ms']:>10.1f}"
+              f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['error_rate']:>9.1%}")
+    print(f"\nStub served {stub.requests} range requests")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': vars(args), 'results': report}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
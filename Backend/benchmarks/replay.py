@@ -0,0 +1,218 @@
+"""
+Traffic Replay
+Drives the analyzer and breach checker in-process with the request mix recorded
+by traffic capture (CAPTURE_PATH), against the HIBP stub or a real range API
+
+Passwords are never captured, so each item is replayed as a stand-in with the
+recorded length and character classes, derived from its keyed hash so repeats
+stay repeats. The ML models score the recorded feature vector itself, and breach
+checks look up a hash under the recorded HIBP prefix, so cache behaviour matches.
+Each request runs only the methods and models it selected, and requests that were
+rejected (non-2xx) are counted but not replayed.
+
+Run from the directory that contains models/ (the repository root):
+
+    python Backend/benchmarks/replay.py capture.jsonl --concurrency 8
+    python Backend/benchmarks/replay.py capture.jsonl --speed 1 --cache-size 1024
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import string
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from src.password_analyzer import PasswordAnalyzer  # noqa: E402
+from src.breach_checker import BreachChecker  # noqa: E402
+from src.capture import FEATURE_FIELDS, read_capture  # noqa: E402
+from src.metrics import METRICS  # noqa: E402
+from hibp_stub import HIBPStub  # noqa: E402
+from load_test import percentile  # noqa: E402
+
+CLASS_ALPHABETS = {
+    'has_upper': string.ascii_uppercase,
+    'has_lower': string.ascii_lowercase,
+    'has_digit': string.digits,
+    'has_special': '!@#$%^&*(),.?":{}|<>',
+}
+ANALYZE_ENDPOINTS = {'analyze_password', 'batch_analyze_password', 'analyze_and_check'}
+BREACH_ENDPOINTS = {'check_breach', 'batch_check_breach', 'analyze_and_check'}
+ANALYZER_METHODS = {'zxcvbn': 'zxcvbn', 'ml': 'ml_models'}  # Request method names to the analyzer's
+
+
+def stand_in_password(item):
+    """A password with the item's length and character classes, fixed by its keyed hash."""
+    features = dict(zip(FEATURE_FIELDS, item['f']))
+    rng = random.Random(item['h'])
+    alphabets = [alphabet for name, alphabet in CLASS_ALPHABETS.items() if features.get(name)]
+    alphabets = alphabets or [string.ascii_lowercase]
+    chars = [rng.choice(alphabet) for alphabet in alphabets][:item['n']]
+    pool = ''.join(alphabets)
+    chars += [rng.choice(pool) for _ in range(item['n'] - len(chars))]
+    rng.shuffle(chars)
+    return ''.join(chars)
+
+
+def stand_in_hash(item):
+    """A SHA-1 under the recorded HIBP prefix, fixed by the keyed hash."""
+    return item['p'] + hashlib.sha1(item['h'].encode()).hexdigest().upper()[5:]
+
+
+class Replayer:
+    """Replays capture records on a thread pool and collects per-endpoint latencies."""
+
+    def __init__(self, analyzer, checker, concurrency, speed):
+        self.analyzer = analyzer
+        self.checker = checker
+        self.concurrency = concurrency
+        self.speed = speed
+        self.latencies = defaultdict(list)
+        self.recorded = defaultdict(list)
+        self.items = 0
+        self.skipped = defaultdict(int)
+        self.distinct_hashes = set()
+        self.distinct_prefixes = set()
+        self._lock = threading.Lock()
+
+    def _replay(self, record):
+        items = record['items']
+        # Records without 'm' ran their endpoint's defaults
+        selected = record.get('m')
+        methods = None if selected is None else [ANALYZER_METHODS[m] for m in selected if m in ANALYZER_METHODS]
+        check_breach = record['ep'] in BREACH_ENDPOINTS if selected is None else 'breach' in selected
+        start = time.perf_counter()
+        if record['ep'] in ANALYZE_ENDPOINTS and methods != []:
+            if record['ep'] == 'batch_analyze_password':
+                self.analyzer.analyze_batch([stand_in_password(item) for item in items])
+            else:
+                for item in items:
+                    # The models see exactly the captured features; only zxcvbn uses the stand-in
+                    self.analyzer.analyze_password(stand_in_password(item),
+                                                   features=dict(zip(FEATURE_FIELDS, item['f'])),
+                                                   methods=methods, models=record.get('md'))
+        if check_breach:
+            for item in items:
+                self.checker.check_hash_breach(stand_in_hash(item))
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latencies[record['ep']].append(elapsed)
+            if 'ms' in record:
+                self.recorded[record['ep']].append(record['ms'] / 1000)
+
+    def run(self, records):
+        started = time.monotonic()
+        first_timestamp = None
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = []
+            for record in records:
+                if not 200 <= record['s'] < 300:
+                    self.skipped[record['ep']] += 1
+                    continue
+                if self.speed > 0:
+                    # Keep the captured inter-arrival times, scaled by --speed
+                    first_timestamp = first_timestamp if first_timestamp is not None else record['t']
+                    delay = (record['t'] - first_timestamp) / self.speed - (time.monotonic() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                self.items += len(record['items'])
+                for item in record['items']:
+                    self.distinct_hashes.add(item['h'])
+                    self.distinct_prefixes.add(item['p'])
+                futures.append(executor.submit(self._replay, record))
+            for future in futures:
+                future.result()
+        return time.monotonic() - started
+
+    def report(self, elapsed):
+        rows = {}
+        for endpoint in sorted(self.latencies):
+            replayed = sorted(self.latencies[endpoint])
+            recorded = sorted(self.recorded[endpoint])
+            rows[endpoint] = {
+                'requests': len(replayed),
+                'throughput_rps': round(len(replayed) / elapsed, 2),
+                'p50_ms': round(percentile(replayed, 50) * 1000, 2),
+                'p95_ms': round(percentile(replayed, 95) * 1000, 2),
+                'p99_ms': round(percentile(replayed, 99) * 1000, 2),
+                'recorded_p50_ms': round(percentile(recorded, 50) * 1000, 2),
+                'recorded_p99_ms': round(percentile(recorded, 99) * 1000, 2)
+            }
+        hits = METRICS.counters['breach_cache_hits'].value
+        misses = METRICS.counters['breach_cache_misses'].value
+        return {
+            'endpoints': rows,
+            'skipped_non_2xx': dict(self.skipped),
+            'items': self.items,
+            'distinct_passwords': len(self.distinct_hashes),
+            'repeat_ratio': round(1 - len(self.distinct_hashes) / self.items, 4) if self.items else 0.0,
+            'distinct_hibp_prefixes': len(self.distinct_prefixes),
+            'breach_cache_hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay captured traffic against the analyzer and breach checker')
+    parser.add_argument('capture', help='Capture file (rotated copies next to it are read first)')
+    parser.add_argument('--backups', type=int, default=5, help='Rotated capture files to look for (default: 5)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Requests replayed at once (default: 4)')
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help='Replay at this multiple of the captured pace; 0 replays as fast as possible')
+    parser.add_argument('--limit', type=int, default=0, help='Replay at most this many requests')
+    parser.add_argument('--cache-size', type=int, default=4096, help='Breach range cache entries (default: 4096)')
+    parser.add_argument('--hibp-url', help='Range API to use instead of the local stub')
+    parser.add_argument('--stub-latency', type=float, default=0.05, help='Seconds of stub latency per request')
+    parser.add_argument('--json', help='Also write the report to this JSON file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    records = list(read_capture(args.capture, args.backups))
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        print(f"No capture records found at {args.capture}")
+        return 1
+
+    analyzer = PasswordAnalyzer()
+    stub = None
+    if not args.hibp_url:
+        stub = HIBPStub(latency=args.stub_latency)
+        stub.start()
+    try:
+        checker = BreachChecker(api_url=args.hibp_url or stub.url, request_delay=0, batch_delay=0,
+                                cache_size=args.cache_size)
+        replayer = Replayer(analyzer, checker, args.concurrency, args.speed)
+        print(f"Replaying {len(records)} requests with concurrency {args.concurrency}")
+        report = replayer.report(replayer.run(records))
+    finally:
+        if stub:
+            stub.stop()
+
+    print(f"\n{'endpoint':<26}{'requests':>10}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'rec p50':>10}{'rec p99':>10}")
+    for endpoint, row in report['endpoints'].items():
+        print(f"{endpoint:<26}{row['requests']:>10}{row['throughput_rps']:>10.1f}{row['p50_ms']:>10.1f}"
+              f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['recorded_p50_ms']:>10.1f}"
+              f"{row['recorded_p99_ms']:>10.1f}")
+    print(f"\n{report['items']} passwords, {report['distinct_passwords']} distinct "
+          f"(repeat ratio {report['repeat_ratio']:.1%}), {report['distinct_hibp_prefixes']} distinct HIBP prefixes; "
+          f"breach cache hit rate {report['breach_cache_hit_rate']:.1%} with {args.cache_size} entries")
+    if report['skipped_non_2xx']:
+        print(f"Skipped {sum(report['skipped_non_2xx'].values())} requests that were rejected when captured")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': vars(args), 'results': report}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
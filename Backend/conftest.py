@@ -0,0 +1,35 @@
+"""
+Shared fixtures for tests that drive the Flask app in-process
+"""
+
+import os
+
+import pytest
+
+from benchmarks.hibp_stub import HIBPStub
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    """The app module, imported once with background work off and models loaded from the repository root."""
+    os.environ.setdefault('HEALTH_PROBE_INTERVAL', '0')
+    os.environ.setdefault('LOG_FILE', '')
+    os.environ.setdefault('HIBP_REQUEST_DELAY', '0')
+    os.environ.setdefault('HIBP_BATCH_DELAY', '0')
+    cwd = os.getcwd()
+    os.chdir(REPO_ROOT)  # Model and scaler paths are relative to the repository root
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    return app
+
+
+@pytest.fixture
+def client(app_module, monkeypatch):
+    """Test client whose breach checks go to a local HIBP stub."""
+    with HIBPStub() as stub:
+        monkeypatch.setattr(app_module.breach_checker, 'api_url', stub.url)
+        yield app_module.app.test_client()
@@ -0,0 +1,130 @@
+"""
+Admission Control
+Cost-based per-client token buckets and a global in-flight cost budget, so excess
+load is shed before any analysis work starts
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+# Relative cost of each method for one short password; a unit is roughly one zxcvbn run
+METHOD_COSTS = {'zxcvbn': 1.0, 'ml': 0.5, 'breach': 1.0}
+ZXCVBN_CHARS_PER_UNIT = 32  # zxcvbn's matching grows with length, the other stages barely do
+
+
+def password_cost(length: int, methods: Iterable[str]) -> float:
+    """Estimated cost of running the given methods on one password of this length."""
+    methods = list(methods)
+    cost = sum(METHOD_COSTS.get(method, 1.0) for method in methods)
+    if 'zxcvbn' in methods:
+        cost += length / ZXCVBN_CHARS_PER_UNIT
+    return cost
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; carries the seconds the client should wait."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucket:
+    """Refills at `rate` units per second up to `burst`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, cost: float) -> float:
+        """Spend `cost` tokens if available; returns 0, or the seconds until they would be."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Thread-safe admission decisions for estimated request costs
+
+    A request is admitted when its client's bucket holds enough tokens and the cost
+    of everything in flight stays within `max_inflight_cost`. One request is charged
+    at most `max_request_cost` (a quarter of the budget by default), so the largest
+    batches still fit alongside other work instead of waiting for an idle server, and
+    one costlier than the burst only needs a full bucket.
+    """
+
+    def __init__(self, client_rate: float = 50.0, client_burst: float = 200.0,
+                 max_inflight_cost: float = 64.0, max_clients: int = 10000,
+                 max_request_cost: Optional[float] = None):
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_inflight_cost = max_inflight_cost
+        self.max_request_cost = max_request_cost or max_inflight_cost / 4
+        self.max_clients = max_clients
+        self.inflight_cost = 0.0
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, client_id: str) -> TokenBucket:
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            bucket = self._buckets[client_id] = TokenBucket(self.client_rate, self.client_burst)
+            if len(self._buckets) > self.max_clients:
+                # The least recently seen client's bucket has long since refilled
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client_id)
+        return bucket
+
+    def admit(self, client_id: str, cost: float) -> float:
+        """
+        Admit a request or raise AdmissionRejected
+
+        Returns:
+            float: The cost charged, to be passed to release() when the request ends
+        """
+        cost = min(cost, self.max_request_cost, self.max_inflight_cost)
+        with self._lock:
+            if self.inflight_cost + cost > self.max_inflight_cost:
+                raise AdmissionRejected('Server at capacity', 1.0)
+            wait = self._bucket(client_id).take(min(cost, self.client_burst))
+            if wait:
+                raise AdmissionRejected('Client rate limit exceeded', wait)
+            self.inflight_cost += cost
+            return cost
+
+    def admit_wait(self, client_id: str, cost: float, timeout: float) -> float:
+        """
+        Admit like admit(), but wait up to `timeout` seconds for room instead of failing
+
+        Used for work that is already under way, such as the next item of a stream,
+        where pacing the producer is better than dropping the item.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.admit(client_id, cost)
+            except AdmissionRejected as e:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise
+                time.sleep(min(e.retry_after, remaining, 0.25))
+
+    def release(self, cost: float):
+        with self._lock:
+            self.inflight_cost = max(0.0, self.inflight_cost - cost)
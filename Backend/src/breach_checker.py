@@ -6,7 +6,16 @@ Checks if passwords have been exposed in known data breaches using Have I Been P
 import hashlib
 import requests
 import logging
+import threading
 import time
+from collections import OrderedDict
+
+try:
+    from .circuit_breaker import CircuitBreaker
+    from .metrics import METRICS
+except ImportError:
+    from circuit_breaker import CircuitBreaker
+    from metrics import METRICS
 
 logger = logging.getLogger(__name__)
 
@@ -17,10 +26,57 @@ class BreachChecker:
     Uses k-anonymity model for privacy protection
     """
 
-    def __init__(self):
-        self.api_url = "https://api.pwnedpasswords.com/range/"
-        self.request_delay = 1.5  # Delay between requests to be respectful to API
+    def __init__(self, api_url="https://api.pwnedpasswords.com/range/", request_delay=1.5, batch_delay=0.5,
+                 cache_size=4096, cache_ttl=3600, timeout=10, breaker=None):
+        self.api_url = api_url
+        self.timeout = timeout
+        self.request_delay = request_delay  # Delay between requests to be respectful to API
+        self.batch_delay = batch_delay  # Extra delay between passwords in a batch
         self.last_request_time = 0
+        # LRU cache of parsed range responses: prefix -> (fetched_at, {suffix: count})
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._range_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Stops upstream calls while the API keeps failing; expired cache entries serve meanwhile
+        self.breaker = breaker or CircuitBreaker()
+
+    def _cached_range(self, hash_prefix, allow_stale=False):
+        """Return the cached suffix counts for a prefix, or None if missing or expired (unless allow_stale)"""
+        with self._cache_lock:
+            entry = self._range_cache.get(hash_prefix)
+            if entry is None or (not allow_stale and time.time() - entry[0] > self.cache_ttl):
+                return None
+            self._range_cache.move_to_end(hash_prefix)
+            return entry[1]
+
+    def _store_range(self, hash_prefix, suffix_counts):
+        """Cache the suffix counts for a prefix, evicting the least recently used entry"""
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._range_cache[hash_prefix] = (time.time(), suffix_counts)
+            self._range_cache.move_to_end(hash_prefix)
+            while len(self._range_cache) > self.cache_size:
+                self._range_cache.popitem(last=False)
+
+    @staticmethod
+    def _parse_range(body):
+        """
+        Parse a range response body into suffix counts
+
+        Args:
+            body (str): Response text with one SUFFIX:COUNT entry per line
+
+        Returns:
+            dict: Hash suffix to breach count
+        """
+        suffix_counts = {}
+        for hash_entry in body.splitlines():
+            hash_part, sep, count = hash_entry.partition(':')
+            if sep:
+                suffix_counts[hash_part] = int(count)
+        return suffix_counts
 
     def _rate_limit(self):
         """Implement rate limiting for API requests"""
@@ -59,44 +115,74 @@ class BreachChecker:
         try:
             # Hash the password
             password_hash = self._hash_password(password)
+        except Exception as e:
+            logger.error("Unexpected error during breach check: %s", e)
+            return {
+                'error': 'Unexpected error',
+                'message': 'An unexpected error occurred',
+                'recommendation': 'Breach check temporarily unavailable.'
+            }
+        return self.check_hash_breach(password_hash)
+
+    def check_hash_breach(self, password_hash):
+        """
+        Check if a SHA-1 password hash has been exposed in known breaches
+
+        Args:
+            password_hash (str): 40-character hex SHA-1 of the password
+
+        Returns:
+            dict: Breach check results
+        """
+        if not isinstance(password_hash, str) or len(password_hash) != 40 or \
+                any(c not in '0123456789abcdefABCDEF' for c in password_hash):
+            return {
+                'error': 'Invalid hash',
+                'message': 'Expected a 40-character hexadecimal SHA-1 hash',
+                'recommendation': 'Send the SHA-1 hash of the password in hex.'
+            }
+        try:
+            password_hash = password_hash.upper()
             hash_prefix = password_hash[:5]
             hash_suffix = password_hash[5:]
 
+            suffix_counts = self._cached_range(hash_prefix)
+            if suffix_counts is not None:
+                METRICS.inc('breach_cache_hits')
+                return self._breach_result(suffix_counts.get(hash_suffix, 0))
+            METRICS.inc('breach_cache_misses')
+
+            if not self.breaker.allow_request():
+                return self._circuit_open_result(hash_prefix, hash_suffix)
+
             # Rate limit requests
             self._rate_limit()
 
             # Make API request
-            response = requests.get(
-                f"{self.api_url}{hash_prefix}",
-                headers={'User-Agent': 'Password-Strength-Analyzer'},
-                timeout=10
-            )
+            try:
+                with METRICS.time('breach_network'):
+                    response = requests.get(
+                        f"{self.api_url}{hash_prefix}",
+                        headers={'User-Agent': 'Password-Strength-Analyzer'},
+                        timeout=self.timeout
+                    )
+            except requests.exceptions.RequestException:
+                self.breaker.record_failure()
+                raise
 
             if response.status_code == 200:
+                self.breaker.record_success()
                 # Parse response
-                hash_list = response.text.strip().split('\n')
-
-                for hash_entry in hash_list:
-                    if ':' in hash_entry:
-                        hash_part, count = hash_entry.split(':')
-                        if hash_part == hash_suffix:
-                            return {
-                                'is_breached': True,
-                                'breach_count': int(count),
-                                'message': f'Password found in {count} breaches',
-                                'recommendation': 'This password has been exposed in data breaches. Choose a different password.'
-                            }
-
-                # Password not found in breaches
-                return {
-                    'is_breached': False,
-                    'breach_count': 0,
-                    'message': 'Password not found in known breaches',
-                    'recommendation': 'Good! This password has not been found in known data breaches.'
-                }
+                with METRICS.time('breach_parse'):
+                    suffix_counts = self._parse_range(response.text)
+                self._store_range(hash_prefix, suffix_counts)
+                return self._breach_result(suffix_counts.get(hash_suffix, 0))
 
-            elif response.status_code == 429:
+            # 429s and server errors both count towards opening the circuit
+            self.breaker.record_failure()
+            if response.status_code == 429:
                 # Rate limited
+                METRICS.inc('breach_upstream_429')
                 logger.warning("Rate limited by Have I Been Pwned API")
                 return {
                     'error': 'Rate limited',
@@ -105,7 +191,8 @@ class BreachChecker:
                 }
 
             else:
-                logger.error(f"API request failed with status code: {response.status_code}")
+                METRICS.inc('breach_upstream_errors')
+                logger.error("API request failed with status code: %s", response.status_code)
                 return {
                     'error': 'API request failed',
                     'message': f'Unable to check breaches (HTTP {response.status_code})',
@@ -113,6 +200,7 @@ class BreachChecker:
                 }
 
         except requests.exceptions.Timeout:
+            METRICS.inc('breach_upstream_errors')
             logger.error("API request timed out")
             return {
                 'error': 'Timeout',
@@ -121,7 +209,8 @@ class BreachChecker:
             }
 
         except requests.exceptions.RequestException as e:
-            logger.error(f"Network error during breach check: {str(e)}")
+            METRICS.inc('breach_upstream_errors')
+            logger.error("Network error during breach check: %s", e)
             return {
                 'error': 'Network error',
                 'message': 'Unable to connect to breach database',
@@ -129,13 +218,58 @@ class BreachChecker:
             }
 
         except Exception as e:
-            logger.error(f"Unexpected error during breach check: {str(e)}")
+            logger.error("Unexpected error during breach check: %s", e)
             return {
                 'error': 'Unexpected error',
                 'message': 'An unexpected error occurred',
                 'recommendation': 'Breach check temporarily unavailable.'
             }
 
+    def _circuit_open_result(self, hash_prefix, hash_suffix):
+        """
+        Answer without calling upstream while the circuit is open
+
+        A stale cached range is still a correct answer for everything but passwords
+        breached since it was fetched, so it is preferred over failing.
+        """
+        suffix_counts = self._cached_range(hash_prefix, allow_stale=True)
+        if suffix_counts is not None:
+            METRICS.inc('breach_stale_hits')
+            result = self._breach_result(suffix_counts.get(hash_suffix, 0))
+            result['stale'] = True
+            return result
+        METRICS.inc('breach_circuit_rejections')
+        return {
+            'error': 'Circuit open',
+            'message': 'Breach database is temporarily unavailable',
+            'recommendation': 'Breach check temporarily unavailable. Please try again later.'
+        }
+
+    @staticmethod
+    def _breach_result(count):
+        """
+        Build the breach check result for a suffix count
+
+        Args:
+            count (int): Number of times the hash appears in the range (0 if absent)
+
+        Returns:
+            dict: Breach check results
+        """
+        if count:
+            return {
+                'is_breached': True,
+                'breach_count': count,
+                'message': f'Password found in {count} breaches',
+                'recommendation': 'This password has been exposed in data breaches. Choose a different password.'
+            }
+        return {
+            'is_breached': False,
+            'breach_count': 0,
+            'message': 'Password not found in known breaches',
+            'recommendation': 'Good! This password has not been found in known data breaches.'
+        }
+
     def batch_check_breaches(self, passwords):
         """
         Check multiple passwords for breaches with rate limiting
@@ -149,16 +283,67 @@ class BreachChecker:
         results = []
 
         for i, password in enumerate(passwords):
-            logger.info(f"Checking password {i + 1}/{len(passwords)} for breaches")
+            logger.info("Checking password %s/%s for breaches", i + 1, len(passwords))
             result = self.check_password_breach(password)
             results.append(result)
 
             # Add extra delay for batch processing
-            if i < len(passwords) - 1:  # Don't delay after the last request
-                time.sleep(0.5)
+            if i < len(passwords) - 1 and self.batch_delay:  # Don't delay after the last request
+                time.sleep(self.batch_delay)
 
         return results
 
+
+class BreachApiProbe:
+    """
+    Background thread that periodically checks the breach API is reachable
+
+    Health checks read the cached result instead of making their own upstream
+    request, so monitoring traffic never adds latency or counts against rate limits.
+    """
+
+    def __init__(self, api_url, interval=30, timeout=5):
+        self.url = f"{api_url}00000"
+        self.interval = interval
+        self.timeout = timeout
+        self._status = {'status': 'Not checked yet', 'checked_at': None, 'latency_ms': None}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def probe(self):
+        """Run one check and cache its result."""
+        start = time.perf_counter()
+        try:
+            response = requests.head(self.url, headers={'User-Agent': 'Password-Strength-Analyzer'},
+                                     timeout=self.timeout)
+            status = "API accessible" if response.status_code == 200 else "API connectivity issue"
+        except requests.exceptions.RequestException:
+            status = "API connectivity unavailable"
+        with self._lock:
+            self._status = {
+                'status': status,
+                'checked_at': time.time(),
+                'latency_ms': round((time.perf_counter() - start) * 1000, 1)
+            }
+
+    def status(self):
+        with self._lock:
+            return dict(self._status)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='breach-api-probe', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
 # if __name__ == '__main__':
 #     # Create an instance of BreachChecker
 #     checker = BreachChecker()
@@ -0,0 +1,147 @@
+"""
+Traffic Capture
+Opt-in recording of non-reversible per-request data (features, lengths, keyed
+hashes, HIBP prefixes and stage timings) for replaying realistic load
+
+Each request becomes one compact JSON line in a size-rotated file. The request
+thread only enqueues the raw record on a bounded queue; the background writer
+thread derives the features and hashes and writes the line, and records are
+dropped rather than waited for when the queue is full.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import queue
+import random
+import time
+from logging.handlers import QueueListener, RotatingFileHandler
+from typing import Any, Dict, List, Optional
+
+try:
+    from .log_config import DroppingQueueHandler
+    from .password_analyzer import check_password_features, sanitize_input
+except ImportError:
+    from log_config import DroppingQueueHandler
+    from password_analyzer import check_password_features, sanitize_input
+
+# Order of the feature values in each captured item's "f" list
+FEATURE_FIELDS = tuple(check_password_features('a'))
+KEYED_HASH_HEX = 16  # 64 bits: repeats are detectable, collisions negligible at capture volumes
+
+
+def keyed_hash(key: bytes, password: str) -> str:
+    """HMAC-SHA256 of the password, truncated; unlinkable to the password without the key."""
+    return hmac.new(key, password.encode(), hashlib.sha256).hexdigest()[:KEYED_HASH_HEX]
+
+
+def capture_item(key: bytes, password: str) -> Dict[str, Any]:
+    """
+    The recorded form of one password
+
+    Returns:
+        dict: n (length), f (feature values in FEATURE_FIELDS order), h (keyed hash)
+        and p (the 5-character HIBP range prefix, already disclosed to the breach API)
+    """
+    password = sanitize_input(password)
+    features = check_password_features(password)
+    return {
+        'n': len(password),
+        'f': [round(features[name], 4) if isinstance(features[name], float) else int(features[name])
+              for name in FEATURE_FIELDS],
+        'h': keyed_hash(key, password),
+        'p': hashlib.sha1(password.encode()).hexdigest()[:5].upper()
+    }
+
+
+class _CaptureEntry:
+    """A queued capture record, rendered to its JSON line only when the writer thread formats it."""
+
+    def __init__(self, key: bytes, entry: Dict[str, Any], passwords: List[str]):
+        self.key = key
+        self.entry = entry
+        self.passwords = passwords
+        self.line = None
+
+    def __str__(self) -> str:
+        # The rotating handler formats each record twice (rollover check, then write)
+        if self.line is None:
+            self.entry['items'] = [capture_item(self.key, password) for password in self.passwords]
+            self.passwords = []
+            self.line = json.dumps(self.entry, separators=(',', ':'))
+        return self.line
+
+
+class TrafficCapture:
+    """
+    Writes capture records to a rotating file from a background thread
+
+    Args:
+        path (str): Capture file; rotated copies are path.1 ... path.N (oldest last)
+        key (bytes): Secret for the keyed hashes; keep it stable to link repeats across restarts
+        max_bytes (int): Size at which the file rotates
+        backup_count (int): Rotated files kept
+        sample_rate (float): Fraction of eligible requests recorded
+        queue_size (int): Records buffered before new ones are dropped
+    """
+
+    def __init__(self, path: str, key: bytes, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                 sample_rate: float = 1.0, queue_size: int = 10000):
+        self.key = key
+        self.sample_rate = sample_rate
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self._listener = QueueListener(queue.Queue(maxsize=queue_size), handler)
+        # A private, non-propagating logger keeps capture records out of the application logs
+        self._logger = logging.Logger('password_analyzer.capture')
+        self._logger.addHandler(DroppingQueueHandler(self._listener.queue, 'capture_records_dropped'))
+        self._listener.start()
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def record(self, endpoint: str, passwords: List[str], status: int,
+               timings: Optional[Dict[str, float]] = None, elapsed: Optional[float] = None,
+               methods: Optional[List[str]] = None, models: Optional[List[str]] = None):
+        """
+        Queue one request's record
+
+        `timings` are per-stage seconds; `methods` and `models` are what the request
+        selected (None when it ran the endpoint's defaults or did no analysis).
+        """
+        entry = {'t': round(time.time(), 3), 'ep': endpoint, 's': status}
+        if elapsed is not None:
+            entry['ms'] = round(elapsed * 1000, 3)
+        if timings:
+            entry['st'] = {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()}
+        if methods is not None:
+            entry['m'] = list(methods)
+        if models is not None:
+            entry['md'] = list(models)
+        passwords = [password for password in passwords if isinstance(password, str)]
+        self._logger.info('%s', _CaptureEntry(self.key, entry, passwords))
+
+    def close(self):
+        """Flush queued records and stop the writer thread; safe to call more than once."""
+        if self._listener._thread is not None:
+            self._listener.stop()
+
+
+def read_capture(path: str, backup_count: int = 5):
+    """
+    Yield captured records oldest first, across the rotated files
+
+    Args:
+        path (str): Capture file as passed to TrafficCapture
+        backup_count (int): Highest rotated suffix to look for
+    """
+    paths = [f"{path}.{index}" for index in range(backup_count, 0, -1)] + [path]
+    for file_path in paths:
+        try:
+            with open(file_path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except FileNotFoundError:
+            continue
@@ -0,0 +1,85 @@
+"""
+Circuit Breaker
+Stops calling a failing upstream after consecutive failures and lets a single
+trial request through on an exponential backoff schedule
+"""
+
+import random
+import threading
+import time
+from typing import Any, Dict
+
+
+class CircuitBreaker:
+    """
+    Thread-safe closed/open/half-open circuit breaker
+
+    Closed: requests flow; `failure_threshold` consecutive failures open the circuit.
+    Open: requests are refused until the backoff expires, then one trial is let through.
+    Half-open: the trial's success closes the circuit; its failure re-opens it with the
+    backoff doubled (up to `max_backoff`).
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, base_backoff: float = 5.0, max_backoff: float = 300.0):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._backoff = base_backoff
+        self._retry_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Whether a request may go upstream now; an allowed half-open trial must report back."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() >= self._retry_at:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._backoff = self.base_backoff
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN:
+                self._backoff = min(self._backoff * 2, self.max_backoff)
+                self._open()
+            elif self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._backoff = self.base_backoff
+                self._open()
+
+    def _open(self):
+        """Open the circuit; jitter keeps workers from probing upstream in lockstep."""
+        self.state = self.OPEN
+        self.times_opened += 1
+        self._trial_in_flight = False
+        self._retry_at = time.monotonic() + self._backoff * random.uniform(0.9, 1.1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state for health reporting."""
+        with self._lock:
+            retry_in = max(0.0, self._retry_at - time.monotonic()) if self.state == self.OPEN else 0.0
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'times_opened': self.times_opened,
+                'retry_in_seconds': round(retry_in, 1)
+            }
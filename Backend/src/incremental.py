@@ -0,0 +1,263 @@
+"""
+Incremental Analysis
+Keystroke sessions whose password features update in O(1) per appended or deleted
+character, so zxcvbn and the models only run once typing goes idle
+"""
+
+import logging
+import math
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+try:
+    from .password_analyzer import COMMON_PATTERNS, RE_DIGIT, RE_LOWER, RE_SPECIAL, RE_UPPER, sanitize_input
+except ImportError:
+    from password_analyzer import COMMON_PATTERNS, RE_DIGIT, RE_LOWER, RE_SPECIAL, RE_UPPER, sanitize_input
+
+logger = logging.getLogger(__name__)
+
+MAX_SESSION_LENGTH = 1000  # Same cap sanitize_input applies to a whole password
+
+
+def _c_log_c(count: int) -> float:
+    """count * log2(count), the per-character term of the entropy sum."""
+    return count * math.log2(count) if count > 1 else 0.0
+
+
+class PatternAutomaton:
+    """Aho-Corasick automaton over the lower-cased common patterns."""
+
+    def __init__(self, patterns: List[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.output: List[List[int]] = [[]]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern.lower():
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(index)
+        # Breadth-first failure links; each state's output also includes its failure chain's
+        fail = [0] * len(self.goto)
+        queue = list(self.goto[0].values())
+        while queue:
+            state = queue.pop(0)
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = self.goto[fallback].get(char, 0) if self.goto[fallback].get(char) != child else 0
+                self.output[child] = self.output[child] + self.output[fail[child]]
+        self._fail = fail
+
+    def step(self, state: int, char: str) -> int:
+        while state and char not in self.goto[state]:
+            state = self._fail[state]
+        return self.goto[state].get(char, 0)
+
+
+_AUTOMATON = PatternAutomaton(COMMON_PATTERNS)
+
+
+class IncrementalFeatures:
+    """
+    Running check_password_features state for a password edited at its end
+
+    Every counter check_password_features derives is kept up to date, and a stack of
+    per-character undo records makes deleting the last character O(1) as well.
+    """
+
+    def __init__(self):
+        self.chars: List[str] = []
+        self.counts: Dict[str, int] = {}
+        self.c_log_c_sum = 0.0
+        self.upper = self.lower = self.digit = self.special = 0
+        self.sequential = 0
+        self.repeated = 0
+        self.pattern_hits = [0] * len(COMMON_PATTERNS)
+        self.distinct_patterns = 0
+        # Per position: (automaton state after the character, pattern indexes matched there)
+        self._history: List[Any] = []
+
+    @property
+    def value(self) -> str:
+        return ''.join(self.chars)
+
+    def __len__(self) -> int:
+        return len(self.chars)
+
+    def _class_delta(self, char: str, delta: int):
+        if RE_UPPER.match(char):
+            self.upper += delta
+        if RE_LOWER.match(char):
+            self.lower += delta
+        if RE_DIGIT.match(char):
+            self.digit += delta
+        if RE_SPECIAL.match(char):
+            self.special += delta
+
+    def _is_sequential_end(self, position: int) -> bool:
+        """Whether chars[position-2:position+1] is a run of consecutive code points."""
+        if position < 2:
+            return False
+        a, b, c = self.chars[position - 2], self.chars[position - 1], self.chars[position]
+        return ord(b) == ord(a) + 1 and ord(c) == ord(b) + 1
+
+    def append(self, char: str):
+        """Add one character to the end of the password."""
+        self.chars.append(char)
+        position = len(self.chars) - 1
+        count = self.counts.get(char, 0)
+        self.counts[char] = count + 1
+        self.c_log_c_sum += _c_log_c(count + 1) - _c_log_c(count)
+        self._class_delta(char, 1)
+        if self._is_sequential_end(position):
+            self.sequential += 1
+        if position >= 1 and self.chars[position - 1] == char:
+            self.repeated += 1
+        state = self._history[-1][0] if self._history else 0
+        matched = []
+        for lowered in char.lower():
+            state = _AUTOMATON.step(state, lowered)
+            matched.extend(_AUTOMATON.output[state])
+        for index in matched:
+            if self.pattern_hits[index] == 0:
+                self.distinct_patterns += 1
+            self.pattern_hits[index] += 1
+        self._history.append((state, matched))
+
+    def pop(self):
+        """Remove the last character of the password."""
+        if not self.chars:
+            return
+        position = len(self.chars) - 1
+        char = self.chars[position]
+        if self._is_sequential_end(position):
+            self.sequential -= 1
+        if position >= 1 and self.chars[position - 1] == char:
+            self.repeated -= 1
+        _, matched = self._history.pop()
+        for index in matched:
+            self.pattern_hits[index] -= 1
+            if self.pattern_hits[index] == 0:
+                self.distinct_patterns -= 1
+        count = self.counts[char]
+        self.c_log_c_sum += _c_log_c(count - 1) - _c_log_c(count)
+        if count == 1:
+            del self.counts[char]
+        else:
+            self.counts[char] = count - 1
+        self._class_delta(char, -1)
+        self.chars.pop()
+        if not self.chars:
+            self.c_log_c_sum = 0.0  # Drop accumulated floating-point drift
+
+    def extend(self, text: str):
+        """Append text, stopping at MAX_SESSION_LENGTH characters."""
+        for char in text[:MAX_SESSION_LENGTH - len(self.chars)]:
+            self.append(char)
+
+    def set_value(self, value: str):
+        """Move to a new full value, only redoing the characters after the common prefix."""
+        common = 0
+        limit = min(len(self.chars), len(value))
+        while common < limit and self.chars[common] == value[common]:
+            common += 1
+        while len(self.chars) > common:
+            self.pop()
+        self.extend(value[common:])
+
+    def features(self) -> Dict[str, Any]:
+        """The same dict check_password_features returns for the current value."""
+        length = len(self.chars)
+        entropy = math.log2(length) - self.c_log_c_sum / length if length else 0.0
+        return {
+            'length': length,
+            'has_upper': self.upper > 0,
+            'has_lower': self.lower > 0,
+            'has_digit': self.digit > 0,
+            'has_special': self.special > 0,
+            'sequential_chars': self.sequential,
+            'repeated_chars': self.repeated,
+            'common_patterns': self.distinct_patterns,
+            'entropy': max(entropy, 0.0),
+            'char_diversity': len(self.counts) / length if length else 0
+        }
+
+
+class KeystrokeSession:
+    """One client's in-progress password plus its debounced full analysis."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.features = IncrementalFeatures()
+        self.version = 0
+        self.last_edit = time.monotonic()
+        self.last_used = self.last_edit
+        self.analysis_version = -1
+        self.analysis: Optional[Dict[str, Any]] = None
+        self.lock = threading.Lock()
+
+    def apply(self, append: str = None, delete: int = None, value: str = None):
+        """Apply one edit: append text, delete characters from the end, or replace the value."""
+        if value is not None:
+            self.features.set_value(sanitize_input(value, MAX_SESSION_LENGTH))
+        if delete:
+            for _ in range(min(delete, len(self.features))):
+                self.features.pop()
+        if append:
+            self.features.extend(sanitize_input(append, MAX_SESSION_LENGTH))
+        self.version += 1
+        self.last_edit = self.last_used = time.monotonic()
+
+    def idle_for(self) -> float:
+        return time.monotonic() - self.last_edit
+
+
+class SessionStore:
+    """
+    Thread-safe LRU of keystroke sessions with idle expiry
+
+    Sessions are held in this process only; with several workers, each session's
+    requests must be routed to the worker that created it.
+    """
+
+    def __init__(self, ttl: float = 300, max_sessions: int = 10000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, KeystrokeSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_used <= self.ttl and len(self._sessions) <= self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+
+    def create(self) -> KeystrokeSession:
+        session = KeystrokeSession(secrets.token_urlsafe(16))
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self._expire()
+        return session
+
+    def get(self, session_id: str) -> Optional[KeystrokeSession]:
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = time.monotonic()
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
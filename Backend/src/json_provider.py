@@ -0,0 +1,52 @@
+"""
+JSON Provider
+Flask JSON provider backed by orjson when it is installed, falling back to the
+standard library encoder otherwise
+"""
+
+from typing import Any, Union
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional dependency; the default provider is used without it
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    DefaultJSONProvider that encodes with orjson
+
+    orjson also serializes numpy scalars and arrays natively. Calls asking for
+    options orjson cannot express (e.g. an indent other than 2) use the stdlib path.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self.dumps_bytes(obj, **kwargs).decode('utf-8')
+
+    def dumps_bytes(self, obj: Any, **kwargs: Any) -> bytes:
+        """Encode straight to UTF-8 bytes, skipping the str round trip where the caller can."""
+        indent = kwargs.pop('indent', None)
+        sort_keys = kwargs.pop('sort_keys', False)
+        kwargs.pop('ensure_ascii', None)  # orjson always emits UTF-8
+        if orjson is None or kwargs or indent not in (None, 2):
+            return super().dumps(obj, indent=indent, sort_keys=sort_keys, **kwargs).encode('utf-8')
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        dump_args = {'sort_keys': self.sort_keys}
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            dump_args['indent'] = 2
+        return self._app.response_class(self.dumps_bytes(obj, **dump_args) + b'\n', mimetype=self.mimetype)
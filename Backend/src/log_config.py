@@ -0,0 +1,151 @@
+"""
+Logging Configuration
+Synchronous or queue-based asynchronous handlers, per-endpoint sampling and
+JSON lines output for the API's logs
+"""
+
+import json
+import logging
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Optional
+
+try:
+    from .metrics import METRICS
+except ImportError:
+    from metrics import METRICS
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, logger, message and endpoint if known."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        endpoint = getattr(record, 'endpoint', None)
+        if endpoint:
+            entry['endpoint'] = endpoint
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of INFO-and-below records per endpoint
+
+    Warnings and errors always pass. `endpoint_getter` returns the current request's
+    path (or None outside a request); it is also stamped on the record as `endpoint`.
+    The decision is stored on the record, so every handler keeps or drops it together.
+    """
+
+    def __init__(self, rates: Dict[str, float], endpoint_getter: Callable[[], Optional[str]]):
+        super().__init__()
+        self.rates = rates
+        self.endpoint_getter = endpoint_getter
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sampled = getattr(record, 'sampled', None)
+        if sampled is not None:
+            return sampled
+        endpoint = self.endpoint_getter()
+        record.endpoint = endpoint
+        if record.levelno >= logging.WARNING or endpoint is None:
+            sampled = True
+        else:
+            rate = self.rates.get(endpoint, 1.0)
+            sampled = rate >= 1.0 or random.random() < rate
+        record.sampled = sampled
+        return sampled
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks the caller
+
+    Records are enqueued unformatted (the listener thread does the formatting) and
+    dropped, and counted in the `dropped_counter` metric, when the queue is full.
+    """
+
+    def __init__(self, handler_queue: queue.Queue, dropped_counter: str = 'log_records_dropped'):
+        super().__init__(handler_queue)
+        self.dropped_counter = dropped_counter
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            METRICS.inc(self.dropped_counter)
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse '/api/x=0.1,/api/y=0.5' into {path: rate}."""
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        path, sep, rate = part.rpartition('=')
+        if not sep:
+            raise ValueError(f"Invalid log sample rate: {part} (expected PATH=RATE)")
+        rates[path] = float(rate)
+    return rates
+
+
+def configure_logging(mode: str = 'sync', fmt: str = 'text', log_file: Optional[str] = 'app.log',
+                      level: int = logging.INFO, queue_size: int = 10000,
+                      sample_rates: Optional[Dict[str, float]] = None,
+                      endpoint_getter: Optional[Callable[[], Optional[str]]] = None) -> Optional[QueueListener]:
+    """
+    Configure the root logger
+
+    Args:
+        mode (str): 'sync' writes from the logging thread; 'async' hands records to a
+            background listener through a bounded queue
+        fmt (str): 'text' or 'json' (one JSON object per line)
+        log_file (str): File to append to in addition to stderr, or None
+        level (int): Root log level
+        queue_size (int): Records buffered in async mode before new ones are dropped
+        sample_rates (dict): Fraction of INFO records kept per endpoint path
+        endpoint_getter (callable): Returns the current endpoint path for sampling
+
+    Returns:
+        QueueListener: The started listener in async mode (stop it to flush), else None
+    """
+    if mode not in ('sync', 'async'):
+        raise ValueError(f"Unknown log mode: {mode} (choose 'sync' or 'async')")
+    formatter = JsonLineFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(level)
+
+    listener = None
+    if mode == 'async':
+        listener = QueueListener(queue.Queue(maxsize=queue_size), *handlers, respect_handler_level=True)
+        handlers = [DroppingQueueHandler(listener.queue)]
+    if sample_rates and endpoint_getter:
+        # Sampling runs on the request thread, where the endpoint is known; one shared
+        # filter, whose decision is kept on the record, means all outputs agree
+        sampling_filter = SamplingFilter(sample_rates, endpoint_getter)
+        for handler in handlers:
+            handler.addFilter(sampling_filter)
+    for handler in handlers:
+        root.addHandler(handler)
+    if listener:
+        listener.start()
+    return listener
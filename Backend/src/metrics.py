@@ -0,0 +1,171 @@
+"""
+Metrics Module
+In-process latency histograms and counters exposed in Prometheus text format
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) shared by every latency histogram
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL_TIMER = nullcontext()
+
+# Per-request {label: seconds} that timers also add to while set (see record_timings)
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar('timings', default=None)
+
+
+class Histogram:
+    """Thread-safe histogram keyed by a single label."""
+
+    def __init__(self, name: str, help_text: str, label: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self._series: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, value: float):
+        """Record one observation; the last slot of each series holds +Inf, then count, then sum."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 1) + [0, 0.0]
+            series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for label_value, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{{{self.label}="{label_value}",le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_count{{{self.label}="{label_value}"}} {series[-2]}')
+            lines.append(f'{self.name}_sum{{{self.label}="{label_value}"}} {series[-1]}')
+        return lines
+
+
+class Counter:
+    """Thread-safe monotonically increasing counter."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter", f"{self.name} {self.value}"]
+
+
+class _Timer:
+    """Context manager that records its elapsed time into a histogram series."""
+    __slots__ = ('histogram', 'label_value', 'start')
+
+    def __init__(self, histogram: Histogram, label_value: str):
+        self.histogram = histogram
+        self.label_value = label_value
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.histogram.observe(self.label_value, elapsed)
+        timings = _timings.get()
+        if timings is not None:
+            timings[self.label_value] = timings.get(self.label_value, 0.0) + elapsed
+        return False
+
+
+def record_timings():
+    """
+    Start collecting this context's stage and model timings
+
+    Returns:
+        tuple: (the dict being filled, token for stop_recording)
+
+    Work handed to other threads is included when submitted through
+    contextvars.copy_context().run, as analyze_password's stage fan-out does.
+    """
+    timings = {}
+    return timings, _timings.set(timings)
+
+
+def stop_recording(token):
+    _timings.reset(token)
+
+
+class MetricsRegistry:
+    """
+    Registry for the analyzer's stage latencies and breach-check counters
+
+    When disabled, time() returns a shared no-op context manager and inc() returns
+    immediately, so instrumented code pays only an attribute check.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stage_seconds = Histogram(
+            'password_analyzer_stage_seconds', 'Time spent in each analysis stage', 'stage')
+        self.model_seconds = Histogram(
+            'password_analyzer_model_predict_seconds', 'Time spent in predict_proba per model', 'model')
+        self.counters = {
+            name: Counter(f'password_analyzer_{name}_total', help_text)
+            for name, help_text in (
+                ('breach_cache_hits', 'Breach lookups answered from the range cache'),
+                ('breach_cache_misses', 'Breach lookups that required an upstream request'),
+                ('breach_upstream_429', 'Upstream HIBP responses with status 429'),
+                ('breach_upstream_errors', 'Upstream HIBP requests that failed or returned an error status'),
+                ('breach_stale_hits', 'Breach lookups answered from an expired cache entry while the circuit was open'),
+                ('breach_circuit_rejections', 'Breach lookups failed fast because the circuit was open'),
+                ('admission_rejected', 'Requests shed with a 429 by admission control'),
+                ('log_records_dropped', 'Log records discarded because the async log queue was full'),
+                ('capture_records_dropped', 'Traffic capture records discarded because the capture queue was full'),
+            )
+        }
+
+    def time(self, stage: str):
+        """Time a block as the given analysis stage."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.stage_seconds, stage)
+
+    def time_model(self, model_name: str):
+        """Time a block as a predict_proba call of the given model."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.model_seconds, model_name)
+
+    def inc(self, name: str, amount: int = 1):
+        """Increment one of the registered counters."""
+        if self.enabled:
+            self.counters[name].inc(amount)
+
+    def render(self) -> str:
+        """Render every metric in Prometheus text exposition format."""
+        lines = self.stage_seconds.render() + self.model_seconds.render()
+        for counter in self.counters.values():
+            lines.extend(counter.render())
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsRegistry(enabled=os.environ.get('METRICS_ENABLED', '1') != '0')
@@ -3,6 +3,7 @@ Password Strength Analyzer
 Core module for analyzing and generating secure passwords
 """
 
+import contextvars
 import hashlib
 import re
 import numpy as np
@@ -13,7 +14,17 @@ import joblib
 import os
 import string
 import secrets
-from typing import Dict, Any, Optional
+import time
+from functools import partial
+from concurrent.futures import Executor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+try:
+    from .metrics import METRICS
+    from . import profiler
+except ImportError:
+    from metrics import METRICS
+    import profiler
 
 logger = logging.getLogger(__name__)
 
@@ -23,16 +34,44 @@ RE_LOWER = re.compile(r'[a-z]')
 RE_DIGIT = re.compile(r'\d')
 RE_SPECIAL = re.compile(r'[!@#$%^&*(),.?":{}|<>]')
 
+# Substrings counted (case-insensitively) by the common_patterns feature
+COMMON_PATTERNS = ['123', 'abc', 'qwe', 'asd', 'zxc', '!@#', 'password', '123456', 'admin']
+
+# Character classes the generator draws from; 'special' matches RE_SPECIAL exactly
+GENERATOR_CHARSETS = {
+    'upper': string.ascii_uppercase,
+    'lower': string.ascii_lowercase,
+    'digit': string.digits,
+    'special': '!@#$%^&*(),.?":{}|<>'
+}
+
+# Default analyzer configuration; keys passed in `config` override these
+DEFAULT_CONFIG = {
+    'min_length': 8,
+    'score_thresholds': {'very_weak': 20, 'weak': 40, 'moderate': 60, 'strong': 80},
+    # Seconds each stage may run when analyze_password fans out on an executor
+    'stage_timeouts': {'zxcvbn': 2.0, 'ml_models': 2.0},
+    # 'ensemble' scores with every model in model_paths; 'student' with the distilled model
+    # train_models.py writes to student_model_path, falling back to the ensemble without it
+    'ml_mode': 'ensemble',
+    'student_model_path': 'models/student_model.joblib'
+}
+ML_MODES = ('ensemble', 'student')
+STUDENT_MODEL_NAME = 'student'
+
+# Stages analyze_password can run; callers may select a subset
+ANALYSIS_METHODS = ('zxcvbn', 'ml_models')
+
 # Utility functions for loading models and scaler
 def load_model(file_path: str) -> Optional[Any]:
     """Load a model from a file."""
     if os.path.exists(file_path):
         try:
             model = joblib.load(file_path)
-            logger.info(f"Loaded model from {file_path}")
+            logger.info("Loaded model from %s", file_path)
             return model
         except Exception as e:
-            logger.error(f"Failed to load model from {file_path}: {str(e)}")
+            logger.error("Failed to load model from %s: %s", file_path, e)
     return None
 
 def load_scaler() -> Optional[Any]:
@@ -41,18 +80,19 @@ def load_scaler() -> Optional[Any]:
     if os.path.exists(scaler_path):
         try:
             scaler = joblib.load(scaler_path)
-            logger.info(f"Loaded scaler from {scaler_path}")
+            logger.info("Loaded scaler from %s", scaler_path)
             return scaler
         except Exception as e:
-            logger.error(f"Failed to load scaler from {scaler_path}: {str(e)}")
+            logger.error("Failed to load scaler from %s: %s", scaler_path, e)
     return None
 
 def sanitize_input(input_string: str, max_length: int = 1000) -> str:
     """Sanitize input string for security."""
     if not isinstance(input_string, str):
         return ""
-    sanitized = input_string[:max_length]
-    sanitized = ''.join(char for char in sanitized if ord(char) >= 32 or char in '\n\t')
+    with METRICS.time('sanitize'):
+        sanitized = input_string[:max_length]
+        sanitized = ''.join(char for char in sanitized if ord(char) >= 32 or char in '\n\t')
     return sanitized
 
 def check_password_features(password: str) -> Dict[str, Any]:
@@ -76,8 +116,7 @@ def check_password_features(password: str) -> Dict[str, Any]:
     for i in range(len(password) - 1):
         if password[i] == password[i + 1]:
             features['repeated_chars'] += 1
-    patterns = ['123', 'abc', 'qwe', 'asd', 'zxc', '!@#', 'password', '123456', 'admin']
-    for pattern in patterns:
+    for pattern in COMMON_PATTERNS:
         if pattern.lower() in password.lower():
             features['common_patterns'] += 1
     if password:
@@ -115,11 +154,99 @@ def generate_feedback(features: Dict[str, Any]) -> list:
         feedback.append("Avoid common patterns")
     return feedback
 
+def secure_indices(count: int, alphabet_size: int) -> np.ndarray:
+    """
+    Draw `count` uniform indices below `alphabet_size` from the secrets CSPRNG.
+
+    Bytes at or above the largest multiple of alphabet_size are rejected so the
+    modulo does not bias any character.
+    """
+    limit = 256 - 256 % alphabet_size
+    drawn = np.empty(0, dtype=np.uint8)
+    while drawn.size < count:
+        needed = count - drawn.size
+        chunk = np.frombuffer(secrets.token_bytes(needed + needed // 4 + 16), dtype=np.uint8)
+        drawn = np.concatenate([drawn, chunk[chunk < limit]])
+    return drawn[:count] % alphabet_size
+
+def vectorized_features(codes: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    check_password_features for a matrix of equal-length candidates, one per row.
+
+    `codes` holds ASCII code points. Every feature except common_patterns is
+    computed with whole-array operations.
+    """
+    rows, length = codes.shape
+    steps = np.diff(codes.astype(np.int16), axis=1)
+    special_codes = np.frombuffer(GENERATOR_CHARSETS['special'].encode(), dtype=np.uint8)
+    # Per-row character histograms for diversity and Shannon entropy
+    counts = np.bincount(
+        (codes.astype(np.int64) + np.arange(rows)[:, None] * 128).ravel(), minlength=rows * 128
+    ).reshape(rows, 128)
+    probabilities = counts / length
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entropy = -np.where(counts > 0, probabilities * np.log2(probabilities), 0.0).sum(axis=1)
+    return {
+        'length': np.full(rows, length),
+        'has_upper': ((codes >= 65) & (codes <= 90)).any(axis=1),
+        'has_lower': ((codes >= 97) & (codes <= 122)).any(axis=1),
+        'has_digit': ((codes >= 48) & (codes <= 57)).any(axis=1),
+        'has_special': np.isin(codes, special_codes).any(axis=1),
+        'char_diversity': (counts > 0).sum(axis=1) / length,
+        'sequential_chars': ((steps[:, 1:] == 1) & (steps[:, :-1] == 1)).sum(axis=1),
+        'repeated_chars': (steps == 0).sum(axis=1),
+        'entropy': entropy
+    }
+
+def run_zxcvbn(password: str) -> Dict[str, Any]:
+    """Score a password with zxcvbn; module-level so worker processes can run it."""
+    password = sanitize_input(password)
+    # Truncate password for zxcvbn to avoid 72-character limit
+    zxcvbn_password = password[:72]
+    try:
+        result = zxcvbn(zxcvbn_password)
+        strength_levels = ['Very Weak', 'Weak', 'Fair', 'Good', 'Strong']
+        return {
+            'method': 'zxcvbn',
+            'score': result['score'] * 25,
+            'strength': strength_levels[result['score']],
+            'feedback': result['feedback']['suggestions'],
+            'warning': result['feedback']['warning'] or ''
+        }
+    except Exception as e:
+        logger.error("zxcvbn analysis failed: %s", e)
+        return {
+            'method': 'zxcvbn',
+            'error': str(e),
+            'score': 0,
+            'strength': 'Unknown',
+            'crack_time': 'N/A',
+            'feedback': ['Unable to analyze with zxcvbn'],
+            'warning': 'Analysis failed'
+        }
+
+def stage_timeout_result(method: str, timeout: float) -> Dict[str, Any]:
+    """Placeholder result for a stage that did not finish within its timeout."""
+    return {
+        'method': method,
+        'error': 'Timeout',
+        'timed_out': True,
+        'message': f'Stage did not complete within {timeout}s'
+    }
+
 
 class PasswordAnalyzer:
     """Class for analyzing password strength using multiple methods."""
-    def __init__(self, model_paths: Dict[str, str] = None, config: Dict[str, Any] = None):
+    def __init__(self, model_paths: Dict[str, str] = None, config: Dict[str, Any] = None, pool: Any = None):
+        """
+        Args:
+            model_paths: Model name to joblib path mapping
+            config: Overrides for DEFAULT_CONFIG
+            pool: Optional worker_pool.AnalysisPool; when set, zxcvbn and feature
+                extraction run in its worker processes instead of the calling thread
+        """
         self.models = {}
+        self.pool = pool
         self.feature_names = [
             'length', 'has_upper', 'has_lower', 'has_digit', 'has_special',
             'char_diversity', 'sequential_chars', 'repeated_chars',
@@ -130,20 +257,40 @@ class PasswordAnalyzer:
             'random_forest': 'models/random_forest_model.joblib',
             'xgboost': 'models/xgboost_model.joblib'
         }
-        self.config = config or {
-            'min_length': 8,
-            'score_thresholds': {'very_weak': 20, 'weak': 40, 'moderate': 60, 'strong': 80}
-        }
+        self.config = {**DEFAULT_CONFIG, **(config or {})}
+        if self.config['ml_mode'] not in ML_MODES:
+            raise ValueError(f"Unknown ml_mode: {self.config['ml_mode']} (choose from {', '.join(ML_MODES)})")
+        # Weight of each model's score in the overall average when it is not 1
+        self.model_weights = {}
+        self.student_info = None
         self.scaler = load_scaler()
-        for model_name, file_path in self.model_paths.items():
-            model = load_model(file_path)
-            if model:
-                self.models[model_name] = model
+        if self.config['ml_mode'] == 'student':
+            self._load_student()
+        if not self.models:
+            for model_name, file_path in self.model_paths.items():
+                model = load_model(file_path)
+                if model:
+                    self.models[model_name] = model
         if self.models:
-            logger.info(f"Successfully loaded {len(self.models)} models")
+            logger.info("Successfully loaded %s models", len(self.models))
         else:
             logger.warning("No models loaded")
 
+    def _load_student(self):
+        """Serve the distilled student alone; the teachers are never loaded."""
+        artifact = load_model(self.config['student_model_path'])
+        if not isinstance(artifact, dict) or 'model' not in artifact:
+            logger.warning("Student model unavailable; serving the ensemble")
+            return
+        if artifact.get('feature_names', self.feature_names) != self.feature_names:
+            logger.warning("Student model was trained on different features; serving the ensemble")
+            return
+        self.models = {STUDENT_MODEL_NAME: artifact['model']}
+        # The student stands in for all its teachers, so it keeps their combined share of the overall score
+        self.model_weights = {STUDENT_MODEL_NAME: len(artifact.get('teachers', [])) or 1}
+        self.student_info = {key: artifact.get(key) for key in ('teachers', 'fidelity', 'trained_at')}
+        logger.info("Serving student model distilled from %s", ', '.join(artifact.get('teachers', [])))
+
     def extract_features(self, password: str) -> pd.DataFrame:
         """Extract features for ML model prediction or rule-based analysis."""
         password = sanitize_input(password)
@@ -153,122 +300,345 @@ class PasswordAnalyzer:
             password.encode('ascii')
         except UnicodeEncodeError:
             logger.warning("Non-ASCII characters detected in password")
-        features = check_password_features(password)
-        features_df = pd.DataFrame([features], columns=self.feature_names)
+        with METRICS.time('feature_extraction'):
+            features = self.pool.features(password) if self.pool else check_password_features(password)
+        features_df = self._to_frame([features])
+        if logger.isEnabledFor(logging.DEBUG):
+            # to_dict is costly; only build the payload when it will be logged
+            logger.debug("Features extracted: %s", features_df.to_dict('records')[0])
+        return features_df
+
+    def _to_frame(self, features: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Build the (scaled) model input frame for a list of feature dicts."""
+        features_df = pd.DataFrame(features, columns=self.feature_names)
         if self.scaler:
-            features_df = pd.DataFrame(
-                self.scaler.transform(features_df),
-                columns=self.feature_names
-            )
-        logger.debug(f"Features extracted: {features_df.to_dict('records')[0]}")
+            with METRICS.time('scaling'):
+                features_df = pd.DataFrame(
+                    self.scaler.transform(features_df),
+                    columns=self.feature_names
+                )
         return features_df
 
+    def score_to_strength(self, score: float) -> str:
+        """Map a 0-100 score to a strength label using the configured thresholds."""
+        thresholds = self.config['score_thresholds']
+        return (
+            "Very Weak" if score < thresholds['very_weak'] else
+            "Weak" if score < thresholds['weak'] else
+            "Moderate" if score < thresholds['moderate'] else
+            "Strong" if score < thresholds['strong'] else
+            "Very Strong"
+        )
+
     def zxcvbn_analysis(self, password: str) -> Dict[str, Any]:
         """Analyze password using zxcvbn library."""
-        password = sanitize_input(password)
-        # Truncate password for zxcvbn to avoid 72-character limit
-        zxcvbn_password = password[:72]
-        try:
-            result = zxcvbn(zxcvbn_password)
-            strength_levels = ['Very Weak', 'Weak', 'Fair', 'Good', 'Strong']
-            return {
-                'method': 'zxcvbn',
-                'score': result['score'] * 25,
-                'strength': strength_levels[result['score']],
-                'feedback': result['feedback']['suggestions'],
-                'warning': result['feedback']['warning'] or ''
-            }
-        except Exception as e:
-            logger.error(f"zxcvbn analysis failed: {str(e)}")
-            return {
-                'method': 'zxcvbn',
-                'error': str(e),
-                'score': 0,
-                'strength': 'Unknown',
-                'crack_time': 'N/A',
-                'feedback': ['Unable to analyze with zxcvbn'],
-                'warning': 'Analysis failed'
-            }
+        with METRICS.time('zxcvbn'):
+            if self.pool:
+                return self.pool.zxcvbn(password)
+            return run_zxcvbn(password)
 
-    def ml_analysis(self, password: str) -> Dict[str, Any]:
-        """Analyze password using trained ML models."""
-        predictions = {}
-        if not self.models:
-            return {'method': 'ml_models', 'error': 'No models loaded', 'predictions': predictions}
-        features = self.extract_features(password)
-        for model_name, model in self.models.items():
+    def ml_analysis(self, password: str, features: Optional[Dict[str, Any]] = None,
+                    models: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Analyze password using trained ML models.
+
+        `features` may carry an already computed check_password_features dict
+        (e.g. from an incremental session) to skip feature extraction.
+        `models` restricts the analysis to those loaded models.
+        """
+        selected = self.models if models is None else {
+            name: self.models[name] for name in models if name in self.models}
+        if not selected:
+            return {'method': 'ml_models', 'error': 'No models loaded', 'predictions': {}}
+        if features is None:
+            features_df = self.extract_features(password)
+        else:
+            features_df = self._to_frame([features])
+        return {'method': 'ml_models', 'predictions': self._predict(features_df, selected)[0]}
+
+    def _predict(self, features: pd.DataFrame,
+                 models: Optional[Dict[str, Any]] = None) -> List[Dict[str, Dict[str, Any]]]:
+        """Score every row of a feature frame with each model (default: all loaded) in one pass per model."""
+        rows = [{} for _ in range(len(features))]
+        for model_name, model in (self.models if models is None else models).items():
             try:
-                prob = model.predict_proba(features)[0]
-                logger.debug(f"Model {model_name} probabilities: {prob}")
-                strength_prob = prob[2] if len(prob) > 2 else prob[1] if len(prob) > 1 else prob[0]
-                score = strength_prob * 50  # Scale to 0-100
-                thresholds = self.config['score_thresholds']
-                strength = (
-                    "Very Weak" if score < thresholds['very_weak'] else
-                    "Weak" if score < thresholds['weak'] else
-                    "Moderate" if score < thresholds['moderate'] else
-                    "Strong" if score < thresholds['strong'] else
-                    "Very Strong"
-                )
-                predictions[model_name] = {
-                    'score': round(score, 2),
-                    'strength': strength,
-                    'confidence': round(strength_prob, 3),
-                    'model_name': model_name
-                }
+                with METRICS.time_model(model_name):
+                    strength_probs = self._strength_probabilities(model_name, model, features)
+                logger.debug("Model %s strength probabilities: %s", model_name, strength_probs)
+                weight = self.model_weights.get(model_name)
+                for predictions, strength_prob in zip(rows, strength_probs):
+                    score = strength_prob * 50  # Scale to 0-100
+                    predictions[model_name] = {
+                        'score': round(float(score), 2),
+                        'strength': self.score_to_strength(score),
+                        'confidence': round(float(strength_prob), 3),
+                        'model_name': model_name
+                    }
+                    if weight:
+                        predictions[model_name]['weight'] = weight
             except Exception as e:
-                logger.error(f"Error with model {model_name}: {str(e)}")
-                predictions[model_name] = {'error': str(e), 'model_name': model_name}
-        return {'method': 'ml_models', 'predictions': predictions}
+                logger.error("Error with model %s: %s", model_name, e)
+                for predictions in rows:
+                    predictions[model_name] = {'error': str(e), 'model_name': model_name}
+        return rows
 
-    def analyze_password(self, password: str) -> Dict[str, Any]:
-        """Comprehensive password analysis using all methods."""
+    @staticmethod
+    def _strength_probabilities(model_name: str, model: Any, features: pd.DataFrame) -> np.ndarray:
+        """Strong-class probability per row; the student regresses the teachers' average of it directly."""
+        if model_name == STUDENT_MODEL_NAME:
+            return np.clip(model.predict(features), 0.0, 1.0)
+        probs = model.predict_proba(features)
+        column = 2 if probs.shape[1] > 2 else 1 if probs.shape[1] > 1 else 0
+        return probs[:, column]
+
+    def analyze_password(self, password: str, executor: Optional[Executor] = None,
+                         features: Optional[Dict[str, Any]] = None, methods: Optional[Iterable[str]] = None,
+                         models: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Comprehensive password analysis using all methods.
+
+        When an executor is given, zxcvbn and the ML models run concurrently on it and
+        each stage is bounded by config['stage_timeouts']; a stage that overruns is
+        reported as timed out and the remaining stages are still returned.
+        Precomputed `features` are passed through to ml_analysis.
+        `methods` (a subset of ANALYSIS_METHODS, default all) and `models` select what
+        runs; stages left out are skipped entirely and absent from `analyses`.
+        """
         password = sanitize_input(password)
         if not password:
             return {'error': 'Password cannot be empty'}
         password_hash = hashlib.sha256(password.encode()).hexdigest()[:8]
-        logger.info(f"Analyzing password with hash prefix: {password_hash}")
-        features_df = self.extract_features(password)
+        logger.info("Analyzing password with hash prefix: %s", password_hash)
         results = {
             'password_hash_prefix': password_hash,
             'length': len(password),
             'analyses': {},
             'feedback': []
         }
-        results['analyses']['zxcvbn'] = self.zxcvbn_analysis(password)
-        results['analyses']['ml_models'] = self.ml_analysis(password)
+        methods = ANALYSIS_METHODS if methods is None else methods
+        stages = {}
+        if 'zxcvbn' in methods:
+            stages['zxcvbn'] = self.zxcvbn_analysis
+        if 'ml_models' in methods:
+            stages['ml_models'] = partial(self.ml_analysis, features=features, models=models)
+        if executor is None:
+            for stage, func in stages.items():
+                results['analyses'][stage] = func(password)
+        else:
+            results['analyses'] = self._run_stages(stages, password, executor)
+        return self._combine(results)
+
+    def _combine(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge stage feedback and average the stage scores into the overall rating."""
+        timed_out = [stage for stage, result in results['analyses'].items() if result.get('timed_out')]
+        if timed_out:
+            results['partial'] = True
+            logger.warning("Analysis stages timed out: %s", ', '.join(timed_out))
+        zxcvbn_results = results['analyses'].get('zxcvbn', {})
         combined_feedback = set()
-        if 'feedback' in results['analyses']['zxcvbn']:
-            combined_feedback.update(results['analyses']['zxcvbn']['feedback'])
+        if 'feedback' in zxcvbn_results:
+            combined_feedback.update(zxcvbn_results['feedback'])
         # Add zxcvbn warning to combined feedback if present and not empty
-        zxcvbn_warning = results['analyses']['zxcvbn'].get('warning', '')
+        zxcvbn_warning = zxcvbn_results.get('warning', '')
         if zxcvbn_warning:
             combined_feedback.add(zxcvbn_warning)
         results['feedback'] = list(combined_feedback)
+        # (score, weight) pairs; a distilled student carries the weight of its teachers
         scores = []
-        if 'score' in results['analyses']['zxcvbn']:
-            scores.append(results['analyses']['zxcvbn']['score'])
-        ml_results = results['analyses']['ml_models']
+        if 'score' in zxcvbn_results:
+            scores.append((zxcvbn_results['score'], 1))
+        ml_results = results['analyses'].get('ml_models', {})
         if isinstance(ml_results.get('predictions'), dict):
             for model_pred in ml_results['predictions'].values():
                 if 'score' in model_pred:
-                    scores.append(model_pred['score'])
+                    scores.append((model_pred['score'], model_pred.get('weight', 1)))
         if scores:
-            overall_score = sum(scores) / len(scores)
-            thresholds = self.config['score_thresholds']
-            strength = (
-                "Very Weak" if overall_score < thresholds['very_weak'] else
-                "Weak" if overall_score < thresholds['weak'] else
-                "Moderate" if overall_score < thresholds['moderate'] else
-                "Strong" if overall_score < thresholds['strong'] else
-                "Very Strong"
-            )
+            overall_score = sum(score * weight for score, weight in scores) / sum(weight for _, weight in scores)
             results['overall'] = {
                 'score': round(overall_score, 2),
-                'strength': strength
+                'strength': self.score_to_strength(overall_score)
             }
         return results
 
+    def analyze_batch(self, passwords: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze many passwords at once.
+
+        zxcvbn and feature extraction are chunked across the worker pool when one is
+        configured, and each model scores the whole batch in a single predict_proba call.
+        """
+        results = [None] * len(passwords)
+        pending = []
+        for index, password in enumerate(passwords):
+            password = sanitize_input(password)
+            if password:
+                pending.append((index, password))
+            else:
+                results[index] = {'error': 'Password cannot be empty'}
+        if not pending:
+            return results
+        batch = [password for _, password in pending]
+        with METRICS.time('batch_features_zxcvbn'):
+            if self.pool:
+                staged = self.pool.analyze_chunks(batch)
+            else:
+                staged = [(check_password_features(password), run_zxcvbn(password)) for password in batch]
+        if self.models:
+            predictions = self._predict(self._to_frame([features for features, _ in staged]))
+        else:
+            predictions = None
+        for position, ((index, password), (_, zxcvbn_result)) in enumerate(zip(pending, staged)):
+            if predictions is None:
+                ml_result = {'method': 'ml_models', 'error': 'No models loaded', 'predictions': {}}
+            else:
+                ml_result = {'method': 'ml_models', 'predictions': predictions[position]}
+            results[index] = self._combine({
+                'password_hash_prefix': hashlib.sha256(password.encode()).hexdigest()[:8],
+                'length': len(password),
+                'analyses': {'zxcvbn': zxcvbn_result, 'ml_models': ml_result},
+                'feedback': []
+            })
+        logger.info("Batch analyzed %s passwords", len(pending))
+        return results
+
+    def generate_passwords(self, count: int, length: int = 16, classes: List[str] = None,
+                           min_score: float = 60, exclude_breached: bool = False,
+                           breach_checker: Any = None, max_candidates: int = None) -> Dict[str, Any]:
+        """
+        Generate passwords that satisfy a policy.
+
+        Candidates are drawn from `secrets` in batches and filtered cheapest-first:
+        a vectorized character-class check, then one batched predict_proba per model
+        (dropping candidates that cannot reach min_score even with a perfect zxcvbn
+        score), then zxcvbn, and finally the optional breach lookup.
+
+        Args:
+            count: Number of passwords to return
+            length: Password length
+            classes: Required character classes from GENERATOR_CHARSETS (default: all)
+            min_score: Minimum overall score, computed as in analyze_password
+            exclude_breached: Confirm each password is absent from HIBP via `breach_checker`;
+                generation stops early if the breach check itself fails
+            max_candidates: Give up after this many candidates (default: 50 per requested password)
+
+        Returns:
+            dict: 'passwords' plus per-filter rejection counts, 'surplus' (candidates that passed
+            the model filter but were not needed, or not checked once the breach check failed)
+            and, if the breach check failed, 'breach_error'
+        """
+        classes = list(classes or GENERATOR_CHARSETS)
+        unknown = [name for name in classes if name not in GENERATOR_CHARSETS]
+        if unknown:
+            raise ValueError(f"Unknown character classes: {', '.join(unknown)}")
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        if not max(self.config['min_length'], len(classes)) <= length <= 128:
+            raise ValueError(f"length must be between {max(self.config['min_length'], len(classes))} and 128")
+        if exclude_breached and breach_checker is None:
+            raise ValueError("exclude_breached requires a breach checker")
+        alphabet = np.frombuffer(''.join(GENERATOR_CHARSETS[name] for name in classes).encode(), dtype=np.uint8)
+        max_candidates = max_candidates or count * 50
+        stats = {'candidates': 0, 'rejected_classes': 0, 'rejected_ml': 0,
+                 'rejected_score': 0, 'rejected_breach': 0, 'surplus': 0}
+        accepted = []
+        breach_error = None
+        while len(accepted) < count and stats['candidates'] < max_candidates and breach_error is None:
+            batch = min(max(2 * (count - len(accepted)), 64), max_candidates - stats['candidates'])
+            stats['candidates'] += batch
+            codes = alphabet[secure_indices(batch * length, len(alphabet))].reshape(batch, length)
+            with METRICS.time('generator_features'):
+                features = vectorized_features(codes)
+                keep = np.ones(batch, dtype=bool)
+                for name in classes:
+                    keep &= features[f'has_{name}']
+            stats['rejected_classes'] += int(batch - keep.sum())
+            if not keep.any():
+                continue
+            candidates = [row.tobytes().decode() for row in codes[keep]]
+            frame = pd.DataFrame({name: values[keep] for name, values in features.items()})
+            frame['common_patterns'] = [
+                sum(pattern in candidate.lower() for pattern in COMMON_PATTERNS) for candidate in candidates
+            ]
+            model_scores, weights = self._model_scores(self._to_frame(frame[self.feature_names]))
+            weighted_scores = weights @ model_scores
+            # Upper bound on the overall score assuming zxcvbn gives its maximum of 100
+            best_case = (100 + weighted_scores) / (1 + weights.sum())
+            survivors = [position for position in range(len(candidates)) if best_case[position] >= min_score]
+            stats['rejected_ml'] += len(candidates) - len(survivors)
+            # Only confirm as many as are still needed; shortfalls are made up in the next batch
+            stats['surplus'] += max(0, len(survivors) - (count - len(accepted)))
+            survivors = survivors[:count - len(accepted)]
+            batch_passwords = [candidates[position] for position in survivors]
+            with METRICS.time('zxcvbn'):
+                if self.pool:
+                    zxcvbn_results = [result for _, result in self.pool.analyze_chunks(batch_passwords)]
+                else:
+                    zxcvbn_results = [run_zxcvbn(candidate) for candidate in batch_passwords]
+            for checked, (position, candidate, zxcvbn_result) in enumerate(
+                    zip(survivors, batch_passwords, zxcvbn_results)):
+                overall = (zxcvbn_result.get('score', 0) + weighted_scores[position]) / (1 + weights.sum())
+                if overall < min_score:
+                    stats['rejected_score'] += 1
+                    continue
+                if exclude_breached:
+                    breach = breach_checker.check_password_breach(candidate)
+                    if breach.get('error'):
+                        # The API is unavailable, not the password breached; further checks would fail too
+                        breach_error = breach['error']
+                        stats['surplus'] += len(survivors) - checked
+                        break
+                    if breach.get('is_breached'):
+                        stats['rejected_breach'] += 1
+                        continue
+                accepted.append({
+                    'password': candidate,
+                    'score': round(float(overall), 2),
+                    'strength': self.score_to_strength(overall)
+                })
+        if len(accepted) < count:
+            logger.warning("Generator produced %s/%s passwords within %s candidates", len(accepted), count, max_candidates)
+        result = {'passwords': accepted, 'requested': count, 'stats': stats}
+        if breach_error:
+            result['breach_error'] = breach_error
+        return result
+
+    def _model_scores(self, features: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        0-100 scores from each loaded model, as _predict computes them
+
+        Returns:
+            tuple: (n_models, n_rows) score array and the models' weights in the overall average
+        """
+        scores = []
+        weights = []
+        for model_name, model in self.models.items():
+            try:
+                with METRICS.time_model(model_name):
+                    scores.append(self._strength_probabilities(model_name, model, features) * 50)
+            except Exception as e:
+                logger.error("Error with model %s: %s", model_name, e)
+                continue
+            weights.append(self.model_weights.get(model_name, 1))
+        return np.array(scores).reshape(len(scores), len(features)), np.array(weights, dtype=float)
+
+    def _run_stages(self, stages: Dict[str, Any], password: str, executor: Executor) -> Dict[str, Dict[str, Any]]:
+        """Submit every stage to the executor at once and collect each within its own timeout."""
+        timeouts = self.config['stage_timeouts']
+        started = time.monotonic()
+        # Each stage runs in a copy of the caller's context so per-request timing recording follows it
+        futures = {stage: executor.submit(contextvars.copy_context().run, profiler.follow(func), password)
+                   for stage, func in stages.items()}
+        results = {}
+        for stage, future in futures.items():
+            timeout = timeouts.get(stage, DEFAULT_CONFIG['stage_timeouts'].get(stage, 2.0))
+            remaining = max(0.0, started + timeout - time.monotonic())
+            try:
+                results[stage] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                future.cancel()
+                results[stage] = stage_timeout_result(stage, timeout)
+        return results
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
     analyzer = PasswordAnalyzer()
@@ -0,0 +1,189 @@
+"""
+Sampling Profiler
+On-demand stack sampling for live workers, emitting collapsed stacks that
+flamegraph.pl, speedscope and similar tools read directly
+"""
+
+import contextvars
+import functools
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Only one sampler runs at a time so concurrent profile requests can't stack up overhead
+_profile_lock = threading.Lock()
+# The request profile started in this context, followed onto worker threads by follow()
+_active_sampler = contextvars.ContextVar('active_sampler', default=None)
+
+
+def _collapse(frame) -> str:
+    """Render a frame chain root-first as 'func (file:line);func (file:line)'."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    """
+    Background thread that periodically snapshots the stacks of other threads
+
+    Nothing is hooked into the interpreter: while no sampler is running the
+    profiled code pays no cost at all.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_ids: Optional[Iterable[int]] = None):
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if self.thread_ids is not None and thread_id not in self.thread_ids:
+                    continue
+                self.stacks[_collapse(frame)] += 1
+            self.samples += 1
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def attach(self, thread_id: int) -> bool:
+        """Sample `thread_id` too; returns False if it was already sampled."""
+        if self.thread_ids is None or thread_id in self.thread_ids:
+            return False
+        self.thread_ids.add(thread_id)
+        return True
+
+    def detach(self, thread_id: int):
+        if self.thread_ids is not None:
+            self.thread_ids.discard(thread_id)
+
+    def stop(self) -> Dict[str, int]:
+        self._stop.set()
+        self._thread.join()
+        return dict(self.stacks)
+
+
+def format_collapsed(stacks: Dict[str, int]) -> str:
+    """Format sampled stacks as collapsed-stack lines ('frame;frame;frame count')."""
+    return ''.join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def sample_for(seconds: float, interval: float = 0.005) -> Optional[str]:
+    """
+    Sample every thread of this process for a fixed duration
+
+    Returns:
+        str: Collapsed stacks, or None if another profile is already running
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    try:
+        sampler = StackSampler(interval=interval).start()
+        time.sleep(seconds)
+        return format_collapsed(sampler.stop())
+    finally:
+        _profile_lock.release()
+
+
+def begin_profile(thread_ids: Iterable[int], interval: float = 0.005) -> Optional[StackSampler]:
+    """
+    Start sampling the given threads, or return None if another profile is already running
+
+    The sampler is also made the current context's profile, so work this context
+    hands to other threads through follow() is sampled while it runs.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    try:
+        sampler = StackSampler(interval=interval, thread_ids=thread_ids).start()
+    except Exception:
+        _profile_lock.release()
+        raise
+    _active_sampler.set(sampler)
+    return sampler
+
+
+def end_profile(sampler: StackSampler) -> str:
+    """Stop a sampler started by begin_profile and return its collapsed stacks."""
+    _active_sampler.set(None)
+    try:
+        return format_collapsed(sampler.stop())
+    finally:
+        _profile_lock.release()
+
+
+def follow(func):
+    """
+    Wrap `func`, about to be handed to another thread, so the current context's
+    profile (if any) samples that thread for as long as `func` runs there
+    """
+    sampler = _active_sampler.get()
+    if sampler is None:
+        return func
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        thread_id = threading.get_ident()
+        attached = sampler.attach(thread_id)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if attached:
+                sampler.detach(thread_id)
+    return run
+
+
+def write_profile(collapsed: str, output_dir: str, label: str) -> str:
+    """Write collapsed stacks to `output_dir` and return the file path."""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{label}-{os.getpid()}-{int(time.time() * 1000)}.collapsed")
+    with open(path, 'w') as f:
+        f.write(collapsed)
+    return path
+
+
+def install_signal_handler(signum: int, seconds: float, output_dir: str, interval: float = 0.005) -> bool:
+    """
+    Profile the whole worker for `seconds` whenever it receives `signum` (e.g. SIGRTMIN)
+
+    The handler only starts a background thread; the profile is written to
+    `output_dir` when sampling finishes.
+
+    Returns:
+        bool: False if the handler could not be installed (non-main thread or unsupported signal)
+    """
+    def _profile_in_background():
+        collapsed = sample_for(seconds, interval)
+        if collapsed is None:
+            logger.warning("Profile already in progress, ignoring signal")
+            return
+        logger.info(f"Wrote signal-triggered profile to {write_profile(collapsed, output_dir, 'signal')}")
+
+    def _handler(_signum, _frame):
+        threading.Thread(target=_profile_in_background, name="signal-profiler", daemon=True).start()
+
+    try:
+        signal.signal(signum, _handler)
+    except (ValueError, OSError) as e:
+        logger.warning(f"Could not install profiling signal handler: {str(e)}")
+        return False
+    return True
@@ -7,14 +7,18 @@ import pandas as pd
 import numpy as np
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeRegressor
 from xgboost import XGBClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+from sklearn.metrics import accuracy_score, precision_recall_fscore_support, mean_absolute_error, r2_score
 import joblib
 import logging
 import os
-from password_analyzer import check_password_features, PasswordAnalyzer
+import random
+import string
+from datetime import datetime, timezone
+from password_analyzer import check_password_features, PasswordAnalyzer, DEFAULT_CONFIG
 
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -139,6 +143,63 @@ def evaluate_model(model, model_name: str, X_test: pd.DataFrame, y_test: pd.Seri
         return {'error': str(e)}
 
 
+def generate_distillation_passwords(n_samples: int = 100000, seed: int = 42) -> list:
+    """
+    Unlabeled passwords for distillation: random lengths and character sets, with common
+    fragments spliced into some, so the student sees the whole feature space the
+    teachers respond to rather than only the three synthetic label styles.
+    """
+    rng = random.Random(seed)
+    fragments = ['password', '123456', 'qwerty', 'abc123', 'admin', 'letmein', 'qwe', 'asd', 'zxc', '!@#']
+    special = '!@#$%^&*()_+-=[]{}|;:,.<>?'
+    everything = string.ascii_letters + string.digits + special
+    alphabets = [string.ascii_lowercase, string.ascii_uppercase, string.digits, special, everything, everything]
+    passwords = []
+    for _ in range(n_samples):
+        length = rng.randint(1, 32)
+        password = ''.join(rng.choice(rng.choice(alphabets)) for _ in range(length))
+        if rng.random() < 0.4:
+            position = rng.randint(0, len(password))
+            password = password[:position] + rng.choice(fragments) + password[position:]
+        passwords.append(password)
+    return passwords
+
+
+def ensemble_strength(teachers: dict, X_scaled: pd.DataFrame) -> np.ndarray:
+    """Averaged strong-class probability of the teachers, exactly as PasswordAnalyzer._predict derives scores."""
+    outputs = []
+    for model in teachers.values():
+        probs = model.predict_proba(X_scaled)
+        column = 2 if probs.shape[1] > 2 else 1 if probs.shape[1] > 1 else 0
+        outputs.append(probs[:, column])
+    return np.mean(outputs, axis=0)
+
+
+def distill_student(teachers: dict, X_scaled: pd.DataFrame) -> tuple:
+    """
+    Fit a single regression tree to the teachers' averaged output and measure its fidelity
+
+    Returns:
+        tuple: (student model, fidelity metrics on a held-out 20%)
+    """
+    y = ensemble_strength(teachers, X_scaled)
+    X_fit, X_holdout, y_fit, y_holdout = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
+    student = DecisionTreeRegressor(max_depth=12, min_samples_leaf=5, random_state=42)
+    student.fit(X_fit, y_fit)
+    predicted = np.clip(student.predict(X_holdout), 0, 1)
+    # Compare on the 0-100 score scale and on the strength bands users actually see
+    thresholds = sorted(DEFAULT_CONFIG['score_thresholds'].values())
+    teacher_bands = np.searchsorted(thresholds, y_holdout * 50, side='right')
+    student_bands = np.searchsorted(thresholds, predicted * 50, side='right')
+    fidelity = {
+        'mae_score_points': round(float(mean_absolute_error(y_holdout * 50, predicted * 50)), 4),
+        'r2': round(float(r2_score(y_holdout, predicted)), 4),
+        'band_agreement': round(float(np.mean(teacher_bands == student_bands)), 4),
+        'holdout_samples': len(y_holdout)
+    }
+    return student, fidelity
+
+
 # Load datasets
 data_files = [
     r"C:\Users\Cornell O. David\Desktop\Password Strength Analyser\Backend\src\data\common_passwords.csv",
@@ -201,6 +262,27 @@ for model_name, model in models.items():
 joblib.dump(scaler, 'models/scaler.joblib')
 logger.info("Saved scaler")
 
+# Distill the trained ensemble into one student model served with ml_mode='student'
+teachers = {name: model for name, model in models.items() if 'error' not in evaluation_results.get(name, {'error': ''})}
+if teachers:
+    distillation_features = pd.DataFrame(
+        [check_password_features(password) for password in generate_distillation_passwords()],
+        columns=feature_names
+    )
+    distillation_df = pd.DataFrame(
+        scaler.transform(pd.concat([X, distillation_features], ignore_index=True)),
+        columns=feature_names
+    )
+    student, fidelity = distill_student(teachers, distillation_df)
+    joblib.dump({
+        'model': student,
+        'teachers': list(teachers),
+        'feature_names': feature_names,
+        'fidelity': fidelity,
+        'trained_at': datetime.now(timezone.utc).isoformat()
+    }, 'models/student_model.joblib')
+    logger.info(f"Distilled {', '.join(teachers)} into student model; fidelity: {fidelity}")
+
 # # Print evaluation summary
 # print("\nModel Evaluation Summary:")
 # print("-" * 50)
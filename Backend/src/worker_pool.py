@@ -0,0 +1,105 @@
+"""
+Analysis Worker Pool
+Runs the CPU-bound zxcvbn scoring and feature extraction in warm worker processes
+so a single server process can use every core instead of contending for the GIL
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+try:
+    from .password_analyzer import check_password_features, run_zxcvbn, sanitize_input
+except ImportError:
+    from password_analyzer import check_password_features, run_zxcvbn, sanitize_input
+
+logger = logging.getLogger(__name__)
+
+
+class PoolBusyError(RuntimeError):
+    """Raised when the pool's pending-task budget stays exhausted for longer than the queue timeout."""
+
+
+def _warm_worker():
+    """Process initializer: run zxcvbn once so its dictionaries and matchers are built up front."""
+    run_zxcvbn('warm-up-Passw0rd!')
+
+
+def _ready() -> int:
+    """No-op task used to force every worker process to start."""
+    return os.getpid()
+
+
+def _analyze_chunk(passwords: List[str]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Extract features and zxcvbn results for a chunk of already sanitized passwords."""
+    return [(check_password_features(password), run_zxcvbn(password)) for password in passwords]
+
+
+class AnalysisPool:
+    """
+    Persistent process pool with bounded submission
+
+    At most `max_pending` tasks are queued or running at once. Submitting beyond that
+    waits up to `queue_timeout` seconds for a slot and then raises PoolBusyError, so
+    overload turns into fast rejections instead of an ever-growing queue.
+    """
+
+    def __init__(self, workers: int = None, max_pending: int = None, queue_timeout: float = 1.0,
+                 chunk_size: int = 16):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.queue_timeout = queue_timeout
+        self.chunk_size = chunk_size
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        self.warm()
+        logger.info(f"Started analysis pool with {self.workers} worker processes "
+                    f"(max {self.max_pending} pending tasks)")
+
+    def warm(self):
+        """Start every worker now so the first requests don't pay for process start-up."""
+        futures = [self._executor.submit(_ready) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def submit(self, func, *args) -> Future:
+        """Submit a task, waiting up to queue_timeout for a free slot."""
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PoolBusyError(f"Analysis pool saturated ({self.max_pending} tasks pending)")
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def zxcvbn(self, password: str) -> Dict[str, Any]:
+        """Score one password with zxcvbn in a worker process."""
+        return self.submit(run_zxcvbn, password).result()
+
+    def features(self, password: str) -> Dict[str, Any]:
+        """Extract the feature dict for one password in a worker process."""
+        return self.submit(check_password_features, sanitize_input(password)).result()
+
+    def analyze_chunks(self, passwords: List[str]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Spread a batch across the workers in chunks of `chunk_size`.
+
+        Returns:
+            list: (features, zxcvbn result) pairs in input order
+        """
+        futures = [
+            self.submit(_analyze_chunk, passwords[start:start + self.chunk_size])
+            for start in range(0, len(passwords), self.chunk_size)
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,67 @@
+"""
+Tests for cost-based admission control
+"""
+
+import time
+
+import pytest
+
+from src.admission import AdmissionController, AdmissionRejected, TokenBucket, password_cost
+
+
+def test_password_cost_scales_with_length_only_for_zxcvbn():
+    assert password_cost(0, ['zxcvbn', 'ml']) == 1.5
+    assert password_cost(64, ['zxcvbn']) == 3.0
+    assert password_cost(64, ['breach']) == 1.0
+
+
+def test_token_bucket_reports_wait_when_empty():
+    bucket = TokenBucket(rate=10, burst=5)
+    assert bucket.take(5) == 0.0
+    assert bucket.take(1) == pytest.approx(0.1, abs=0.01)
+
+
+def test_inflight_budget_sheds_and_release_readmits():
+    admission = AdmissionController(client_rate=1000, client_burst=1000, max_inflight_cost=10,
+                                    max_request_cost=10)
+    charged = admission.admit('a', 8)
+    with pytest.raises(AdmissionRejected) as excinfo:
+        admission.admit('b', 4)
+    assert excinfo.value.reason == 'Server at capacity'
+    admission.release(charged)
+    assert admission.admit('b', 4) == 4
+    assert admission.inflight_cost == 4
+
+
+def test_single_request_charge_is_clamped():
+    admission = AdmissionController(client_rate=1000, client_burst=1000, max_inflight_cost=64)
+    # A full 50-password batch costs ~90 units but is charged a quarter of the budget
+    charged = admission.admit('a', 90)
+    assert charged == 16
+    assert admission.admit('b', 90) == 16
+
+
+def test_client_rate_limit_is_per_client():
+    admission = AdmissionController(client_rate=1, client_burst=2, max_inflight_cost=100)
+    admission.release(admission.admit('a', 2))
+    with pytest.raises(AdmissionRejected) as excinfo:
+        admission.admit('a', 1)
+    assert excinfo.value.reason == 'Client rate limit exceeded'
+    assert excinfo.value.retry_after_header == '1'
+    assert admission.admit('b', 1) == 1
+
+
+def test_admit_wait_paces_instead_of_failing():
+    admission = AdmissionController(client_rate=20, client_burst=1, max_inflight_cost=100)
+    admission.admit('a', 1)
+    started = time.monotonic()
+    assert admission.admit_wait('a', 1, timeout=1.0) == 1
+    assert time.monotonic() - started >= 0.03
+
+
+def test_admit_wait_gives_up_after_timeout():
+    admission = AdmissionController(client_rate=1000, client_burst=1000, max_inflight_cost=4,
+                                    max_request_cost=4)
+    admission.admit('a', 4)
+    with pytest.raises(AdmissionRejected):
+        admission.admit_wait('b', 1, timeout=0.05)
@@ -7,7 +7,7 @@ import json
 import time
 
 # API base URL
-BASE_URL = "http://localhost:5000"
+BASE_URL = "http://localhost:8000"
 
 def test_health_check():
     """Test the health check endpoint"""
@@ -141,6 +141,6 @@ if __name__ == "__main__":
         
     except requests.exceptions.ConnectionError:
         print("Error: Could not connect to the API server.")
-        print("Make sure the Flask application is running on http://localhost:5000")
+        print("Make sure the Flask application is running on http://localhost:8000")
     except Exception as e:
         print(f"Unexpected error: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""
+Tests that admission control prices requests from the fields their endpoints actually read
+"""
+
+import pytest
+
+from src.admission import AdmissionController
+
+
+@pytest.fixture
+def limited(app_module, monkeypatch):
+    """A controller whose client bucket barely refills, installed in the app."""
+    admission = AdmissionController(client_rate=0.001, client_burst=5, max_inflight_cost=1000)
+    monkeypatch.setattr(app_module, 'admission', admission)
+    return admission
+
+
+def exhaust(client, path, body):
+    for _ in range(10):
+        if client.post(path, json=body).status_code == 429:
+            return
+    pytest.fail(f"{path} was never rate limited")
+
+
+def test_unread_passwords_field_does_not_zero_the_cost(client, limited):
+    exhaust(client, '/api/analyze-password', {'password': 'hunter2'})
+    response = client.post('/api/analyze-password', json={'password': 'hunter2', 'passwords': []})
+    assert response.status_code == 429
+    assert response.headers['Retry-After']
+
+
+def test_length_cap_applies_to_the_field_the_view_reads(client, app_module):
+    response = client.post('/api/analyze-password',
+                           json={'password': 'x' * (app_module.MAX_PASSWORD_LENGTH + 1), 'passwords': []})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('path, body', [
+    ('/api/check-breach', {'password': 'hunter2', 'methods': []}),
+    ('/api/batch-check-breach', {'passwords': ['a', 'b'], 'methods': []}),
+    ('/api/batch-check-breach', {'passwords': ['a', 'b'], 'methods': ['zxcvbn']}),
+])
+def test_methods_cannot_lower_breach_endpoint_cost(client, limited, path, body):
+    exhaust(client, path, body)
+    assert client.post(path, json=body).status_code == 429
+
+
+def test_empty_methods_are_priced_as_defaults(app_module):
+    with app_module.app.test_request_context('/api/analyze-and-check', method='POST',
+                                             json={'password': 'abc', 'methods': []}):
+        default = app_module.password_cost(3, app_module.ENDPOINT_METHODS['analyze_and_check'])
+        assert app_module.estimate_request_cost() == default
@@ -0,0 +1,56 @@
+"""
+Tests that an interrupted bulk audit resumes without losing or duplicating rows
+"""
+
+import argparse
+import csv
+import os
+
+import audit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def audit_args(input_path, output_path):
+    return argparse.Namespace(
+        input=str(input_path), output=str(output_path), format='csv', checkpoint=None, workers=1,
+        chunk_size=10, max_inflight=2, ml_mode='ensemble', breach=False, hibp_url='', hibp_delay=0.0,
+        progress_interval=60.0
+    )
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_resume_after_interrupt_matches_clean_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(REPO_ROOT)  # Model paths are relative to the repository root
+    input_path = tmp_path / 'passwords.txt'
+    input_path.write_text(''.join(f"pass{index}word{index * 7}\n" for index in range(45)))
+
+    clean = tmp_path / 'clean.csv'
+    assert audit.run_audit(audit_args(input_path, clean)) == 0
+
+    # Interrupt right after the third chunk's rows are written but before its checkpoint
+    save_checkpoint = audit.save_checkpoint
+    saves = []
+
+    def interrupting_save(path, state):
+        if len(saves) == 2:
+            raise KeyboardInterrupt
+        saves.append(state['next_line'])
+        save_checkpoint(path, state)
+
+    resumed = tmp_path / 'resumed.csv'
+    monkeypatch.setattr(audit, 'save_checkpoint', interrupting_save)
+    assert audit.run_audit(audit_args(input_path, resumed)) == 130
+    assert len(read_rows(resumed)) == 30
+
+    monkeypatch.setattr(audit, 'save_checkpoint', save_checkpoint)
+    assert audit.run_audit(audit_args(input_path, resumed)) == 0
+
+    rows = read_rows(resumed)
+    assert [int(row['line']) for row in rows] == list(range(1, 46))
+    assert rows == read_rows(clean)
+    assert 'pass0word0' not in resumed.read_text()
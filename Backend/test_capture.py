@@ -0,0 +1,91 @@
+"""
+Tests for privacy-preserving traffic capture
+"""
+
+import hashlib
+import os
+import threading
+
+from src import capture as capture_module
+from src.capture import FEATURE_FIELDS, TrafficCapture, capture_item, keyed_hash, read_capture
+from src.password_analyzer import check_password_features
+
+
+def test_capture_item_has_no_plaintext():
+    item = capture_item(b'key', 'Tr0ub4dor&3')
+    assert item['n'] == 11
+    assert item['p'] == hashlib.sha1(b'Tr0ub4dor&3').hexdigest()[:5].upper()
+    assert item['h'] == keyed_hash(b'key', 'Tr0ub4dor&3') != keyed_hash(b'other', 'Tr0ub4dor&3')
+    assert 'Tr0ub4dor' not in repr(item)
+    features = check_password_features('Tr0ub4dor&3')
+    assert dict(zip(FEATURE_FIELDS, item['f']))['length'] == features['length']
+
+
+def test_records_round_trip_across_rotation(tmp_path):
+    path = str(tmp_path / 'capture.jsonl')
+    capture = TrafficCapture(path, b'key', max_bytes=300, backup_count=10)
+    for index in range(6):
+        capture.record('analyze_password', [f'secret-{index}'], 200, timings={'zxcvbn': 0.002}, elapsed=0.01)
+    capture.record('batch_analyze_password', ['a', None, 'b'], 200)
+    capture.close()
+    capture.close()
+
+    records = list(read_capture(path, 10))
+    assert [len(record['items']) for record in records] == [1] * 6 + [2]
+    assert records[0]['st'] == {'zxcvbn': 2.0}
+    assert records[0]['ms'] == 10.0
+    assert (tmp_path / 'capture.jsonl.1').exists()
+    assert all('secret' not in line for f in tmp_path.iterdir() for line in f.read_text().splitlines())
+
+
+def test_items_are_built_on_the_writer_thread(tmp_path, monkeypatch):
+    threads = []
+    build = capture_module.capture_item
+    monkeypatch.setattr(capture_module, 'capture_item',
+                        lambda key, password: threads.append(threading.current_thread()) or build(key, password))
+    capture = TrafficCapture(str(tmp_path / 'capture.jsonl'), b'key')
+    capture.record('analyze_password', ['hunter2'], 200)
+    capture.close()
+    assert threads and threading.current_thread() not in threads
+
+
+def test_selected_methods_and_models_are_recorded(app_module, tmp_path):
+    with app_module.app.test_request_context('/api/analyze-password', method='POST'):
+        app_module.run_selected_analysis('hunter2', {'ml'}, ['xgboost'])
+        methods, models = app_module.g.selected_analysis
+
+    path = str(tmp_path / 'capture.jsonl')
+    capture = TrafficCapture(path, b'key')
+    capture.record('analyze_password', ['hunter2'], 200, methods=methods, models=models)
+    capture.record('analyze_password', ['hunter2'], 400)
+    capture.close()
+
+    selected, rejected = read_capture(path, 0)
+    assert (selected['s'], selected['m'], selected['md']) == (200, ['ml'], ['xgboost'])
+    assert rejected['s'] == 400 and 'm' not in rejected and 'md' not in rejected
+
+
+def test_replay_runs_selected_methods_and_skips_rejected_requests(monkeypatch):
+    monkeypatch.syspath_prepend(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+    from replay import Replayer
+
+    class Recorder:
+        def __init__(self):
+            self.calls = []
+
+        def analyze_password(self, password, features=None, methods=None, models=None):
+            self.calls.append(('analyze', methods, models))
+
+        def check_hash_breach(self, sha1):
+            self.calls.append(('breach',))
+
+    item = capture_item(b'key', 'hunter2')
+    recorder = Recorder()
+    replayer = Replayer(recorder, recorder, concurrency=1, speed=0)
+    replayer.run([
+        {'t': 0, 'ep': 'analyze_and_check', 's': 200, 'm': ['breach', 'ml'], 'md': ['xgboost'], 'items': [item]},
+        {'t': 0, 'ep': 'analyze_and_check', 's': 200, 'm': ['breach'], 'items': [item]},
+        {'t': 0, 'ep': 'analyze_password', 's': 503, 'm': ['ml', 'zxcvbn'], 'items': [item]},
+    ])
+    assert recorder.calls == [('analyze', ['ml_models'], ['xgboost']), ('breach',), ('breach',)]
+    assert replayer.skipped == {'analyze_password': 1}
@@ -0,0 +1,74 @@
+"""
+Tests for the breach API circuit breaker and the checker's fallbacks while it is open
+"""
+
+import time
+
+from benchmarks.hibp_stub import HIBPStub
+from src.breach_checker import BreachChecker
+from src.circuit_breaker import CircuitBreaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, base_backoff=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.snapshot()['times_opened'] == 1
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, base_backoff=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_trial_doubles_backoff():
+    breaker = CircuitBreaker(failure_threshold=1, base_backoff=0.01, max_backoff=0.015)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker._backoff == 0.015
+
+
+def test_open_circuit_serves_stale_cache_or_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=1, base_backoff=60)
+    checker = BreachChecker(api_url='http://127.0.0.1:9/', request_delay=0, cache_ttl=-1, breaker=breaker)
+    password_hash = BreachChecker._hash_password('hunter2')
+    checker._store_range(password_hash[:5], {password_hash[5:]: 42})
+    breaker.record_failure()
+
+    stale = checker.check_hash_breach(password_hash)
+    assert stale['is_breached'] and stale['stale']
+
+    missing = checker.check_hash_breach(BreachChecker._hash_password('something else entirely'))
+    assert missing['error'] == 'Circuit open'
+
+
+def test_upstream_429s_open_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=2, base_backoff=60)
+    with HIBPStub(rate_429=1.0) as stub:
+        checker = BreachChecker(api_url=stub.url, request_delay=0, cache_size=0, breaker=breaker)
+        assert checker.check_password_breach('first')['error'] == 'Rate limited'
+        assert checker.check_password_breach('second')['error'] == 'Rate limited'
+        assert checker.check_password_breach('third')['error'] == 'Circuit open'
+    assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,97 @@
+"""
+Tests for the policy-driven password generator and its vectorized features
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from src.password_analyzer import (
+    GENERATOR_CHARSETS, PasswordAnalyzer, check_password_features, secure_indices, vectorized_features
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    cwd = os.getcwd()
+    os.chdir(REPO_ROOT)  # Model and scaler paths are relative to the repository root
+    try:
+        return PasswordAnalyzer()
+    finally:
+        os.chdir(cwd)
+
+
+class FakeBreachChecker:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def check_password_breach(self, password):
+        self.calls += 1
+        return dict(self.result)
+
+
+def test_secure_indices_stay_in_range():
+    indices = secure_indices(5000, 7)
+    assert indices.shape == (5000,)
+    assert indices.max() < 7
+    assert set(np.unique(indices)) == set(range(7))
+
+
+def test_vectorized_features_match_check_password_features():
+    alphabet = ''.join(GENERATOR_CHARSETS.values()) + 'aaabc123'
+    codes = np.frombuffer(alphabet.encode(), dtype=np.uint8)[secure_indices(200 * 12, len(alphabet))]
+    codes = codes.reshape(200, 12)
+    features = vectorized_features(codes)
+    for row, password in enumerate(row.tobytes().decode() for row in codes):
+        expected = check_password_features(password)
+        for name, values in features.items():
+            assert values[row] == pytest.approx(expected[name]), (password, name)
+
+
+def test_generated_passwords_meet_policy(analyzer):
+    result = analyzer.generate_passwords(20, length=12, classes=['upper', 'digit'], min_score=0)
+    passwords = [entry['password'] for entry in result['passwords']]
+    assert len(passwords) == 20
+    for password in passwords:
+        assert len(password) == 12
+        assert set(password) <= set(GENERATOR_CHARSETS['upper'] + GENERATOR_CHARSETS['digit'])
+        assert any(c.isupper() for c in password) and any(c.isdigit() for c in password)
+
+
+def test_every_candidate_is_accounted_for(analyzer):
+    result = analyzer.generate_passwords(200, length=10, min_score=50)
+    stats = result['stats']
+    outcomes = sum(count for name, count in stats.items() if name != 'candidates')
+    assert outcomes + len(result['passwords']) == stats['candidates']
+
+
+def test_breached_candidates_are_rejected(analyzer):
+    checker = FakeBreachChecker({'is_breached': True, 'breach_count': 3})
+    result = analyzer.generate_passwords(2, min_score=0, exclude_breached=True, breach_checker=checker,
+                                         max_candidates=10)
+    assert result['passwords'] == []
+    assert result['stats']['rejected_breach'] == checker.calls > 0
+
+
+def test_breach_errors_stop_generation_without_counting_as_breaches(analyzer):
+    checker = FakeBreachChecker({'error': 'Circuit open'})
+    result = analyzer.generate_passwords(5, min_score=0, exclude_breached=True, breach_checker=checker)
+    assert checker.calls == 1
+    assert result['breach_error'] == 'Circuit open'
+    assert result['stats']['rejected_breach'] == 0
+    outcomes = sum(count for name, count in result['stats'].items() if name != 'candidates')
+    assert outcomes == result['stats']['candidates']
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'classes': ['emoji']},
+    {'length': 200},
+    {'exclude_breached': True},
+])
+def test_invalid_policies_raise(analyzer, kwargs):
+    with pytest.raises(ValueError):
+        analyzer.generate_passwords(1, **kwargs)
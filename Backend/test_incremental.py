@@ -0,0 +1,70 @@
+"""
+Tests that incremental keystroke features match a full recomputation
+"""
+
+import random
+import time
+
+import pytest
+
+from src.incremental import IncrementalFeatures, SessionStore
+from src.password_analyzer import COMMON_PATTERNS, check_password_features
+
+ALPHABET = 'abcdefgxyzABC123!@ ' + ''.join(COMMON_PATTERNS[:5])
+
+
+def assert_matches(incremental, value):
+    expected = check_password_features(value)
+    actual = incremental.features()
+    assert incremental.value == value
+    for name, expected_value in expected.items():
+        assert actual[name] == pytest.approx(expected_value, abs=1e-9), name
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_edits_match_full_recompute(seed):
+    rng = random.Random(seed)
+    incremental = IncrementalFeatures()
+    value = ''
+    for _ in range(300):
+        if value and rng.random() < 0.3:
+            incremental.pop()
+            value = value[:-1]
+        else:
+            char = rng.choice(ALPHABET)
+            incremental.append(char)
+            value += char
+        assert_matches(incremental, value)
+
+
+def test_patterns_sequences_and_repeats():
+    incremental = IncrementalFeatures()
+    incremental.extend('xxabcPassword123')
+    assert_matches(incremental, 'xxabcPassword123')
+    for _ in range(8):
+        incremental.pop()
+    assert_matches(incremental, 'xxabcPas')
+
+
+def test_set_value_keeps_common_prefix():
+    incremental = IncrementalFeatures()
+    incremental.set_value('qwerty123')
+    incremental.set_value('qwertz!')
+    assert_matches(incremental, 'qwertz!')
+    incremental.set_value('')
+    assert_matches(incremental, '')
+
+
+def test_store_expires_idle_sessions_and_evicts_oldest():
+    store = SessionStore(ttl=0.05, max_sessions=2)
+    first = store.create()
+    assert store.get(first.session_id) is first
+    time.sleep(0.06)
+    assert store.get(first.session_id) is None
+
+    store = SessionStore(ttl=60, max_sessions=2)
+    sessions = [store.create() for _ in range(3)]
+    assert store.get(sessions[0].session_id) is None
+    assert store.get(sessions[2].session_id) is sessions[2]
+    assert store.delete(sessions[2].session_id)
+    assert not store.delete(sessions[2].session_id)
@@ -0,0 +1,51 @@
+"""
+Tests for the orjson-backed Flask JSON provider
+"""
+
+import json
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from src import json_provider
+from src.json_provider import FastJSONProvider
+
+needs_orjson = pytest.mark.skipif(json_provider.orjson is None, reason='orjson is not installed')
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+
+@needs_orjson
+def test_numpy_values_and_round_trip(app):
+    payload = {'score': np.float64(61.5), 'flags': np.array([1, 2]), 'name': 'é'}
+    encoded = app.json.dumps(payload)
+    assert json.loads(encoded) == {'score': 61.5, 'flags': [1, 2], 'name': 'é'}
+    assert app.json.loads(encoded.encode()) == json.loads(encoded)
+
+
+@needs_orjson
+def test_sort_keys_and_indent(app):
+    assert app.json.dumps({'b': 1, 'a': 2}, sort_keys=True) == '{"a":2,"b":1}'
+    assert app.json.dumps({'a': 1}, indent=2) == '{\n  "a": 1\n}'
+    # orjson cannot indent by 4, so the stdlib path handles it
+    assert app.json.dumps({'a': 1}, indent=4) == '{\n    "a": 1\n}'
+
+
+@needs_orjson
+def test_response_is_bytes_with_trailing_newline(app):
+    with app.app_context():
+        response = app.json.response({'ok': True})
+    assert response.mimetype == 'application/json'
+    assert response.get_data() == b'{"ok":true}\n'
+
+
+def test_falls_back_without_orjson(app, monkeypatch):
+    monkeypatch.setattr(json_provider, 'orjson', None)
+    assert json.loads(app.json.dumps({'a': [1, 2]})) == {'a': [1, 2]}
+    assert app.json.loads('{"a": 1}') == {'a': 1}
@@ -0,0 +1,68 @@
+"""
+Tests for logging configuration: sampling, JSON lines and the dropping queue handler
+"""
+
+import json
+import logging
+import queue
+
+import pytest
+
+from src.log_config import DroppingQueueHandler, JsonLineFormatter, SamplingFilter, parse_sample_rates
+from src.metrics import METRICS
+
+
+def make_record(level=logging.INFO, msg='hello %s', args=('world',)):
+    return logging.LogRecord('test', level, __file__, 1, msg, args, None)
+
+
+def test_parse_sample_rates():
+    assert parse_sample_rates('/api/a=0.1, /api/b=1') == {'/api/a': 0.1, '/api/b': 1.0}
+    assert parse_sample_rates('') == {}
+    with pytest.raises(ValueError):
+        parse_sample_rates('/api/a')
+
+
+def test_sampling_drops_info_but_keeps_warnings():
+    sampler = SamplingFilter({'/api/a': 0.0}, lambda: '/api/a')
+    assert not sampler.filter(make_record())
+    assert sampler.filter(make_record(level=logging.WARNING))
+    assert SamplingFilter({'/api/a': 0.0}, lambda: '/api/b').filter(make_record())
+    assert SamplingFilter({'/api/a': 0.0}, lambda: None).filter(make_record())
+
+
+def test_json_line_formatter():
+    record = make_record()
+    record.endpoint = '/api/a'
+    entry = json.loads(JsonLineFormatter().format(record))
+    assert entry['message'] == 'hello world'
+    assert entry['level'] == 'INFO'
+    assert entry['endpoint'] == '/api/a'
+    assert entry['ts'].endswith('Z')
+
+
+def test_full_queue_drops_and_counts():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1), 'log_records_dropped')
+    counter = METRICS.counters['log_records_dropped']
+    before = counter.value
+    handler.emit(make_record())
+    handler.emit(make_record())
+    assert handler.queue.qsize() == 1
+    assert counter.value == before + 1
+    # Records are queued unformatted; the listener thread formats them
+    assert handler.queue.get_nowait().args == ('world',)
+
+
+def test_every_handler_keeps_the_same_sampled_records():
+    # Separate instances still agree: the first decision is stored on the record
+    file_filter = SamplingFilter({'/api/a': 0.5}, lambda: '/api/a')
+    console_filter = SamplingFilter({'/api/a': 0.5}, lambda: '/api/a')
+    file_kept, console_kept = [], []
+    for index in range(200):
+        record = make_record(args=(index,))
+        if file_filter.filter(record):
+            file_kept.append(index)
+        if console_filter.filter(record):
+            console_kept.append(index)
+    assert file_kept == console_kept
+    assert 0 < len(file_kept) < 200
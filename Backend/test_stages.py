@@ -0,0 +1,102 @@
+"""
+Tests for per-stage timeouts when analysis stages fan out on an executor
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.password_analyzer import PasswordAnalyzer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    cwd = os.getcwd()
+    os.chdir(REPO_ROOT)  # Model and scaler paths are relative to the repository root
+    try:
+        return PasswordAnalyzer(config={'stage_timeouts': {'zxcvbn': 0.05, 'ml_models': 2.0}})
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def stalled(release, result=None):
+    """A stage that blocks until `release` is set."""
+    def stage(password, **kwargs):
+        release.wait(5)
+        return result or {}
+    return stage
+
+
+def test_slow_stage_times_out_and_the_rest_are_returned(analyzer, executor, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(analyzer, 'zxcvbn_analysis', stalled(release))
+    started = time.monotonic()
+    try:
+        result = analyzer.analyze_password('Tr0ub4dor&3', executor=executor)
+    finally:
+        release.set()
+    assert time.monotonic() - started < 2
+
+    assert result['analyses']['zxcvbn']['timed_out'] is True
+    assert result['analyses']['zxcvbn']['error'] == 'Timeout'
+    assert result['analyses']['ml_models']['predictions']
+    assert result['partial'] is True
+    # The overall rating falls back to the stages that finished
+    assert 'score' in result['overall']
+
+
+def test_no_overall_when_every_stage_times_out(analyzer, executor, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(analyzer, 'zxcvbn_analysis', stalled(release))
+    monkeypatch.setattr(analyzer, 'ml_analysis', stalled(release))
+    monkeypatch.setitem(analyzer.config, 'stage_timeouts', {'zxcvbn': 0.05, 'ml_models': 0.05})
+    try:
+        result = analyzer.analyze_password('Tr0ub4dor&3', executor=executor)
+    finally:
+        release.set()
+
+    assert all(stage['timed_out'] for stage in result['analyses'].values())
+    assert result['partial'] is True
+    assert 'overall' not in result
+
+
+def test_analyze_and_check_reports_timed_out_stages(client, app_module, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(app_module.password_analyzer, 'zxcvbn_analysis', stalled(release))
+    monkeypatch.setitem(app_module.password_analyzer.config, 'stage_timeouts', {'zxcvbn': 0.05, 'ml_models': 2.0})
+    monkeypatch.setattr(app_module.breach_checker, 'check_password_breach', stalled(release))
+    monkeypatch.setattr(app_module, 'BREACH_STAGE_TIMEOUT', 0.05)
+    try:
+        response = client.post('/api/analyze-and-check', json={'password': 'Tr0ub4dor&3'})
+    finally:
+        release.set()
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['partial'] is True
+    assert body['breach_check']['timed_out'] is True
+    analyses = body['analysis']['analyses']
+    assert analyses['zxcvbn']['timed_out'] is True
+    assert analyses['ml_models']['predictions']
+    assert 'overall' in body['analysis']
+
+
+def test_inline_analysis_has_no_timeouts(client, app_module, monkeypatch):
+    # Without a breach check the local stages run inline on the request thread
+    monkeypatch.setitem(app_module.password_analyzer.config, 'stage_timeouts', {'zxcvbn': 0.0, 'ml_models': 0.0})
+    response = client.post('/api/analyze-and-check', json={'password': 'Tr0ub4dor&3', 'methods': ['zxcvbn', 'ml']})
+    body = response.get_json()
+    assert 'partial' not in body
+    assert 'breach_check' not in body
+    assert not any(stage.get('timed_out') for stage in body['analysis']['analyses'].values())
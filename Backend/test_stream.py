@@ -0,0 +1,105 @@
+"""
+Tests for the NDJSON streaming analysis endpoint
+"""
+
+import hashlib
+import io
+import json
+import threading
+import time
+
+import pytest
+
+from src.admission import AdmissionController
+
+
+@pytest.fixture
+def admission(app_module, monkeypatch):
+    """A fresh controller, so in-flight cost can be checked after each stream."""
+    admission = AdmissionController(client_rate=1000, client_burst=1000, max_inflight_cost=1000)
+    monkeypatch.setattr(app_module, 'admission', admission)
+    return admission
+
+
+@pytest.fixture
+def slow_analysis(app_module, monkeypatch):
+    """Analysis that takes as many hundredths of a second as the password says, tracking concurrency."""
+    state = {'running': 0, 'peak': 0}
+    lock = threading.Lock()
+
+    def analyze_password(password):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(int(password.split('-')[1]) / 100)
+        with lock:
+            state['running'] -= 1
+        return {'password': password}
+
+    monkeypatch.setattr(app_module.password_analyzer, 'analyze_password', analyze_password)
+    return state
+
+
+def stream(client, body, query='?breach=false'):
+    response = client.post('/api/stream-analyze' + query, data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_results_keep_input_order_within_the_window(client, app_module, admission, slow_analysis, monkeypatch):
+    monkeypatch.setattr(app_module, 'STREAM_WINDOW', 3)
+    delays = [8, 1, 5, 0, 3, 2, 6, 0]
+    body = ''.join(json.dumps(f'pw-{delay}') + '\n' for delay in delays).encode()
+
+    results = stream(client, body)
+    assert [result['index'] for result in results] == list(range(len(delays)))
+    assert [result['analysis']['password'] for result in results] == [f'pw-{delay}' for delay in delays]
+    assert all('breach_check' not in result for result in results)
+    assert slow_analysis['peak'] <= 3
+    assert admission.inflight_cost == 0
+
+
+def test_over_long_lines_are_skipped_in_bounded_reads(client, app_module, admission, slow_analysis, monkeypatch):
+    monkeypatch.setattr(app_module, 'STREAM_MAX_LINE', 16)
+    body = b'"pw-0"\n' + b'x' * 100 + b'\n"pw-1"\n'
+
+    class RecordingStream(io.BytesIO):
+        sizes = []
+
+        def readline(self, size=-1):
+            self.sizes.append(size)
+            return super().readline(size)
+
+    source = RecordingStream(body)
+    assert list(app_module.read_stream_lines(source)) == [b'"pw-0"\n', None, b'"pw-1"\n']
+    assert all(0 < size <= 17 for size in source.sizes)
+
+    results = stream(client, body)
+    assert results[1] == {'index': 1, 'error': 'Line exceeds 16 bytes'}
+    assert [results[0]['analysis']['password'], results[2]['analysis']['password']] == ['pw-0', 'pw-1']
+    assert admission.inflight_cost == 0
+
+
+def test_invalid_lines_and_hash_items(client, admission, slow_analysis):
+    sha1 = hashlib.sha1(b'password').hexdigest().upper()
+    body = b'not json\n42\n\n' + json.dumps({'sha1': sha1}).encode() + b'\n{"password": "pw-0"}\n'
+
+    invalid, wrong_type, by_hash, by_password = stream(client, body, query='')
+    assert invalid == {'index': 0, 'error': 'Invalid JSON line'}
+    assert wrong_type['index'] == 1 and 'error' in wrong_type
+    assert by_hash['index'] == 2 and 'breach_check' in by_hash and 'analysis' not in by_hash
+    assert by_password['analysis'] == {'password': 'pw-0'} and 'breach_check' in by_password
+    assert admission.inflight_cost == 0
+
+
+def test_disconnect_mid_stream_releases_admission_cost(client, app_module, admission, slow_analysis, monkeypatch):
+    monkeypatch.setattr(app_module, 'STREAM_WINDOW', 4)
+    body = ''.join(json.dumps(f'pw-{delay}') + '\n' for delay in [0] + [5] * 9).encode()
+
+    response = client.post('/api/stream-analyze?breach=false', data=body, content_type='application/x-ndjson',
+                           buffered=False)
+    first = next(response.iter_encoded())
+    assert json.loads(first)['index'] == 0
+    assert admission.inflight_cost > 0
+    response.close()
+    assert admission.inflight_cost == 0
@@ -0,0 +1,95 @@
+"""
+Tests for serving the distilled student model in place of the ensemble
+"""
+
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeRegressor
+
+from src.password_analyzer import STUDENT_MODEL_NAME, PasswordAnalyzer, check_password_features
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEATURE_NAMES = [
+    'length', 'has_upper', 'has_lower', 'has_digit', 'has_special',
+    'char_diversity', 'sequential_chars', 'repeated_chars',
+    'common_patterns', 'entropy'
+]
+TEACHERS = ['logistic_regression', 'random_forest', 'xgboost']
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    monkeypatch.chdir(REPO_ROOT)  # The scaler and ensemble paths are relative to the repository root
+
+
+def write_student(path, feature_names=FEATURE_NAMES, teachers=TEACHERS):
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame(rng.normal(size=(200, len(feature_names))), columns=feature_names)
+    target = 1 / (1 + np.exp(-features.iloc[:, 0]))
+    model = DecisionTreeRegressor(max_depth=3, random_state=0).fit(features, target)
+    joblib.dump({'model': model, 'feature_names': feature_names, 'teachers': teachers,
+                 'fidelity': {'r2': 0.99}, 'trained_at': '2026-01-01T00:00:00'}, path)
+    return model
+
+
+def student_analyzer(path):
+    return PasswordAnalyzer(config={'ml_mode': 'student', 'student_model_path': str(path)})
+
+
+def test_student_replaces_the_ensemble(tmp_path):
+    model = write_student(tmp_path / 'student.joblib')
+    analyzer = student_analyzer(tmp_path / 'student.joblib')
+    assert list(analyzer.models) == [STUDENT_MODEL_NAME]
+    assert analyzer.student_info['teachers'] == TEACHERS
+
+    predictions = analyzer.analyze_password('Tr0ub4dor&3')['analyses']['ml_models']['predictions']
+    assert list(predictions) == [STUDENT_MODEL_NAME]
+    frame = analyzer._to_frame([check_password_features('Tr0ub4dor&3')])
+    expected = np.clip(model.predict(frame), 0, 1)[0] * 50
+    assert predictions[STUDENT_MODEL_NAME]['score'] == round(float(expected), 2)
+
+
+def test_overall_score_weights_the_student_by_its_teachers(tmp_path):
+    write_student(tmp_path / 'student.joblib')
+    analyzer = student_analyzer(tmp_path / 'student.joblib')
+
+    result = analyzer.analyze_password('Tr0ub4dor&3')
+    student = result['analyses']['ml_models']['predictions'][STUDENT_MODEL_NAME]
+    zxcvbn_score = result['analyses']['zxcvbn']['score']
+    assert student['weight'] == len(TEACHERS)
+    expected = (zxcvbn_score + student['score'] * len(TEACHERS)) / (1 + len(TEACHERS))
+    assert result['overall']['score'] == round(expected, 2)
+
+    # The generator's pre-filter scores candidates with the same weights
+    frame = analyzer._to_frame([check_password_features('Tr0ub4dor&3'), check_password_features('abc')])
+    scores, weights = analyzer._model_scores(frame)
+    assert scores.shape == (1, 2)
+    assert weights.tolist() == [len(TEACHERS)]
+    assert scores[0, 0] == pytest.approx(student['score'], abs=0.01)
+
+
+def test_student_without_teachers_counts_once(tmp_path):
+    write_student(tmp_path / 'student.joblib', teachers=[])
+    analyzer = student_analyzer(tmp_path / 'student.joblib')
+    assert analyzer.model_weights == {STUDENT_MODEL_NAME: 1}
+
+
+@pytest.mark.parametrize('artifact', ['missing', 'other_features', 'bare_model'])
+def test_falls_back_to_the_ensemble(tmp_path, artifact):
+    path = tmp_path / 'student.joblib'
+    if artifact == 'other_features':
+        write_student(path, feature_names=FEATURE_NAMES[:-1])
+    elif artifact == 'bare_model':
+        joblib.dump(DecisionTreeRegressor().fit([[0] * len(FEATURE_NAMES)], [0.5]), path)
+
+    analyzer = student_analyzer(path)
+    assert STUDENT_MODEL_NAME not in analyzer.models
+    assert analyzer.models and set(analyzer.models) == set(PasswordAnalyzer().models)
+    assert analyzer.model_weights == {} and analyzer.student_info is None
+
+    result = analyzer.analyze_password('Tr0ub4dor&3')
+    assert all('weight' not in prediction for prediction in result['analyses']['ml_models']['predictions'].values())